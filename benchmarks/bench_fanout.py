@@ -0,0 +1,52 @@
+"""Micro-benchmark: local format fan-out of a FORMAT_RAW stream
+
+Converts a minute of 24 kHz fp32 audio, in TtsResponse-sized chunks, to
+8 kHz mu-law WAV, 24 kHz PCM WAV and 16 kHz A-law, and reports how many
+times faster than real time that runs.
+
+    python benchmarks/bench_fanout.py [--seconds 60] [--chunk-bytes 4096]
+"""
+
+import argparse
+from time import perf_counter
+
+import numpy as np
+
+from pyplayht.fanout import ALAW, MULAW, FanOut, Variant
+
+SOURCE_RATE = 24000
+VARIANTS = [Variant(8000, MULAW), Variant(24000), Variant(16000, ALAW, wav=False)]
+
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=60)
+    parser.add_argument("--chunk-bytes", type=int, default=4096)
+    args = parser.parse_args(argv)
+    samples = np.sin(
+        np.arange(int(args.seconds * SOURCE_RATE)) * 2 * np.pi * 440 / SOURCE_RATE
+    ).astype("<f4")
+    data = samples.tobytes()
+    chunks = [
+        data[offset : offset + args.chunk_bytes]
+        for offset in range(0, len(data), args.chunk_bytes)
+    ]
+    fan_out = FanOut(SOURCE_RATE, VARIANTS)
+    sizes = [0] * len(VARIANTS)
+    start = perf_counter()
+    for chunk in chunks:
+        for index, encoded in enumerate(fan_out.feed(chunk)):
+            sizes[index] += len(encoded)
+    for index, encoded in enumerate(fan_out.finish()):
+        sizes[index] += len(encoded)
+    elapsed = perf_counter() - start
+    print(f"{len(chunks)} chunks, {args.seconds:g}s of audio in {elapsed * 1e3:.1f}ms")
+    print(
+        f"{args.seconds / elapsed:.0f}x real time, {elapsed / len(chunks) * 1e6:.1f}us per chunk"
+    )
+    for variant, size in zip(VARIANTS, sizes):
+        print(f"  {variant}: {size} bytes")
+
+
+if __name__ == "__main__":
+    main()
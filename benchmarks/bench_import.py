@@ -0,0 +1,65 @@
+"""Benchmark: import time of the package and its entry points
+
+Runs ``python -X importtime`` in fresh interpreters and reports the median
+cumulative import time of each module. As a regression check, it fails if
+a module imports something it should not (the runtime proto compiler, or
+grpc for the bare package), or if --max-ms is exceeded.
+
+    python benchmarks/bench_import.py [--runs 5] [--max-ms 400]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+# module -> modules it must not import
+MODULES = {
+    "pyplayht": ("grpc", "eliot", "dotenv"),
+    "pyplayht.auth": ("grpc", "eliot", "dotenv"),
+    "pyplayht.tts": ("grpc_tools.protoc", "pkg_resources", "eliot"),
+    "pyplayht.__main__": ("grpc_tools.protoc", "pkg_resources", "eliot"),
+}
+
+
+def import_times(module: str) -> dict[str, int]:
+    """Return the cumulative import time (us) of every module imported by module."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=os.environ | {"PYPLAYHT_TRACE": ""},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=None)
+    args = parser.parse_args(argv)
+    failures = []
+    for module, forbidden in MODULES.items():
+        runs = [import_times(module) for _ in range(args.runs)]
+        median_ms = statistics.median(times[module] for times in runs) / 1000
+        print(f"{module:>20}: {median_ms:8.1f} ms")
+        failures.extend(
+            f"{module} imports {name}" for name in forbidden if name in runs[0]
+        )
+        if args.max_ms is not None and median_ms > args.max_ms:
+            failures.append(f"{module} takes {median_ms:.1f} ms > {args.max_ms} ms")
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
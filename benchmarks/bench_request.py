@@ -0,0 +1,50 @@
+"""Micro-benchmark: per-call TtsRequest construction in GrpcTts.__call__
+
+Compares the previous approach (mutate the shared TtsParams, build and
+serialize a TtsRequest per call) with the serialized request template.
+
+    python benchmarks/bench_request.py
+"""
+
+import timeit
+from types import SimpleNamespace
+
+from pyplayht.tts import (
+    GrpcTts,
+    HyperParameters,
+    JobParameters,
+    TtsParams,
+    TtsRequest,
+)
+
+TEXTS = ["The quick brown fox jumps over the lazy dog."] * 3
+LEASE = SimpleNamespace(token=bytes(72) + b'{"inference_address": "localhost:1"}')
+
+
+def main(number: int = 100_000):
+    client = object.__new__(GrpcTts)
+    client._merge_params(HyperParameters.default(), JobParameters.default())
+    shared_params = TtsParams()
+    shared_params.CopyFrom(client.tts_params)
+
+    def mutate_and_serialize() -> bytes:
+        shared_params.ClearField("text")
+        shared_params.MergeFrom(TtsParams(text=TEXTS))
+        return TtsRequest(lease=LEASE.token, params=shared_params).SerializeToString()
+
+    def template() -> bytes:
+        return client._request(LEASE, TEXTS)
+
+    assert TtsRequest.FromString(mutate_and_serialize()) == TtsRequest.FromString(
+        template()
+    )
+    for name, function in (
+        ("mutate + serialize", mutate_and_serialize),
+        ("request template", template),
+    ):
+        best = min(timeit.repeat(function, number=number, repeat=5))
+        print(f"{name:>20}: {best / number * 1e6:.2f} us/call")
+
+
+if __name__ == "__main__":
+    main()
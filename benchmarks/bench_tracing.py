@@ -0,0 +1,47 @@
+"""Benchmark: per-call overhead of log_call on hot paths
+
+Times Lease.is_expired() and Session.lease in fresh interpreters with
+tracing off (the default), sampled at 1%, and fully on (the previous
+import-time behaviour), discarding the traces.
+
+    python benchmarks/bench_tracing.py
+"""
+
+import os
+import subprocess
+import sys
+
+MODES = {"off": "0", "sampled 1%": "0.01", "on, the previous default": "1"}
+SNIPPET = """
+import json, timeit
+from datetime import datetime
+from struct import pack
+from pyplayht.auth import Credentials, Lease, Session
+
+created = int((datetime.now() - datetime(2018, 2, 21, 18, 58)).total_seconds())
+token = bytes(64) + pack(">2L", created, 3600) + json.dumps({"inference_address": "localhost:1"}).encode()
+lease = Lease(token)
+session = Session(Credentials("id", "key"))
+session._Session__lease = lease
+for name, function in (("Lease.is_expired", lease.is_expired), ("Session.lease", lambda: session.lease)):
+    best = min(timeit.repeat(function, number=NUMBER, repeat=5))
+    print(f"{name:>20}: {best / NUMBER * 1e6:.2f} us/call")
+"""
+
+
+def main(number: int = 20_000):
+    for mode, value in MODES.items():
+        print(f"PYPLAYHT_TRACE={value} ({mode})")
+        environment = os.environ | {
+            "PYPLAYHT_TRACE": value,
+            "PYPLAYHT_TRACE_FILE": os.devnull,
+        }
+        subprocess.run(
+            [sys.executable, "-c", SNIPPET.replace("NUMBER", str(number))],
+            env=environment,
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Micro-benchmark: per-chunk write and flush vs. the CoalescingWriter
+
+Writes TtsResponse-sized chunks into a pipe drained by another thread,
+once with write() and flush() per chunk (the previous CLI behavior) and
+once through a CoalescingWriter, and reports time and write syscalls.
+
+    python benchmarks/bench_writer.py [--chunks 20000] [--chunk-bytes 4096]
+"""
+
+import argparse
+import os
+import threading
+from time import perf_counter
+
+from pyplayht.writer import CoalescingWriter
+
+
+def drain(fd: int):
+    while os.read(fd, 1 << 20):
+        pass
+
+
+def run(name: str, chunks: list[bytes], make_writer):
+    read_fd, write_fd = os.pipe()
+    reader = threading.Thread(target=drain, args=(read_fd,))
+    reader.start()
+    with open(write_fd, "wb") as output:
+        writer = make_writer(output)
+        start = perf_counter()
+        for chunk in chunks:
+            writer.write(chunk)
+            if not isinstance(writer, CoalescingWriter):
+                writer.flush()
+        if isinstance(writer, CoalescingWriter):
+            writer.close()
+            syscalls = writer.syscalls
+        else:
+            syscalls = len(chunks)
+        elapsed = perf_counter() - start
+    reader.join()
+    os.close(read_fd)
+    print(f"{name:<30} {elapsed * 1e3:8.1f}ms {syscalls:>8} writes")
+
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=20000)
+    parser.add_argument("--chunk-bytes", type=int, default=4096)
+    args = parser.parse_args(argv)
+    chunks = [os.urandom(args.chunk_bytes) for _ in range(args.chunks)]
+    run("write+flush per chunk", chunks, lambda output: output)
+    run("CoalescingWriter", chunks, CoalescingWriter)
+    run(
+        "CoalescingWriter (immediate)",
+        chunks,
+        lambda output: CoalescingWriter(output, immediate=True),
+    )
+
+
+if __name__ == "__main__":
+    main()
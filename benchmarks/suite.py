@@ -0,0 +1,135 @@
+"""Benchmark suite against the local fake PlayHT stack
+
+Measures requests per second, time to first byte and memory for GrpcTts
+(threads), AsyncGrpcTts (one event loop), Session lease refreshes and the
+CLI pipeline, without network access. Peak memory is the process max RSS
+after each scenario.
+
+    python benchmarks/suite.py [--requests 200] [--concurrency 1 8 32]
+"""
+
+import argparse
+import asyncio
+import os
+import resource
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+from pyplayht import AsyncGrpcTts, GrpcTts, HyperParameters
+from pyplayht.__main__ import turn_batch
+from pyplayht.fake import FakePlayHT, FakeTtsServicer
+
+TEXT = "The quick brown fox jumps over the lazy dog."
+
+
+def report(name: str, requests: int, elapsed: float, first_bytes: list[float]):
+    """Print one result row."""
+    max_rss_mib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    if len(first_bytes) > 1:
+        percentiles = statistics.quantiles(first_bytes, n=100)
+        ttfb = f"{percentiles[49] * 1e3:8.1f} {percentiles[98] * 1e3:8.1f}"
+    else:
+        ttfb = f"{'-':>8} {'-':>8}"
+    print(
+        f"{name:<32} {requests:>8} {requests / elapsed:>8.1f} {ttfb} {max_rss_mib:>8.1f}"
+    )
+
+
+def timed_stream(responses) -> float:
+    """Consume a TtsResponse stream, returning the time to its first chunk."""
+    start, first_byte = perf_counter(), None
+    for _ in responses:
+        if first_byte is None:
+            first_byte = perf_counter() - start
+    return first_byte
+
+
+def bench_session(fake: FakePlayHT, requests: int):
+    session = fake.session()
+    start = perf_counter()
+    for _ in range(requests):
+        session._refresh()
+    report("Session._refresh", requests, perf_counter() - start, [])
+    start = perf_counter()
+    for _ in range(requests * 100):
+        session.lease
+    report("Session.lease (cached)", requests * 100, perf_counter() - start, [])
+
+
+def bench_grpc_tts(fake: FakePlayHT, requests: int, concurrency: int, pool: int):
+    with GrpcTts.default(
+        fake.session(),
+        HyperParameters.default(seed=1),
+        channel_credentials=fake.channel_credentials,
+        pool_size=pool,
+    ) as tts:
+        tts.warm()
+        start = perf_counter()
+        with ThreadPoolExecutor(concurrency) as executor:
+            first_bytes = list(
+                executor.map(lambda _: timed_stream(tts([TEXT])), range(requests))
+            )
+        elapsed = perf_counter() - start
+    report(f"GrpcTts c={concurrency} pool={pool}", requests, elapsed, first_bytes)
+
+
+def bench_async_grpc_tts(fake: FakePlayHT, requests: int, concurrency: int):
+    async def run() -> tuple[float, list[float]]:
+        async with AsyncGrpcTts.default(
+            fake.session(), channel_credentials=fake.channel_credentials
+        ) as tts:
+            await tts.warm()
+            limit = asyncio.Semaphore(concurrency)
+
+            async def one() -> float:
+                async with limit:
+                    start, first_byte = perf_counter(), None
+                    async for _ in tts([TEXT]):
+                        if first_byte is None:
+                            first_byte = perf_counter() - start
+                    return first_byte
+
+            start = perf_counter()
+            first_bytes = await asyncio.gather(*(one() for _ in range(requests)))
+            return perf_counter() - start, first_bytes
+
+    elapsed, first_bytes = asyncio.run(run())
+    report(f"AsyncGrpcTts c={concurrency}", requests, elapsed, first_bytes)
+
+
+def bench_cli(fake: FakePlayHT, lines: int, concurrency: int):
+    with GrpcTts.default(
+        fake.session(), channel_credentials=fake.channel_credentials
+    ) as tts, open(os.devnull, "wb") as output:
+        start = perf_counter()
+        turn_batch(tts, [f"{TEXT}\n"] * lines, output, concurrency)
+        elapsed = perf_counter() - start
+    report(f"CLI turn_batch c={concurrency}", lines, elapsed, [])
+
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--chunk-interval", type=float, default=0.001)
+    args = parser.parse_args(argv)
+    servicer = FakeTtsServicer(latency=args.latency, chunk_interval=args.chunk_interval)
+    print(
+        f"{'scenario':<32} {'requests':>8} {'rps':>8} "
+        f"{'ttfb p50':>8} {'ttfb p99':>8} {'rss MiB':>8}"
+    )
+    with FakePlayHT(servicer) as fake:
+        bench_session(fake, args.requests)
+        for concurrency in args.concurrency:
+            bench_grpc_tts(fake, args.requests, concurrency, pool=1)
+        bench_grpc_tts(fake, args.requests, max(args.concurrency), pool=4)
+        for concurrency in args.concurrency:
+            bench_async_grpc_tts(fake, args.requests, concurrency)
+        for concurrency in args.concurrency:
+            bench_cli(fake, args.requests, concurrency)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,58 @@
-from .auth import *
-from .tts import *
+"""Unofficial optimized client for the PlayHT API
 
-__all__ = ["Credentials", "Session", "HyperParameters", "JobParameters", "GrpcTts"]
+Submodules (and their gRPC, protobuf and eliot dependencies) are imported on
+first use of the names exported here.
+"""
+
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .auth import *
+    from .pool import *
+    from .retry import *
+    from .scheduler import *
+    from .tts import *
+
+__all__ = [
+    "Credentials",
+    "Session",
+    "LeaseStore",
+    "HyperParameters",
+    "JobParameters",
+    "GrpcTts",
+    "AsyncGrpcTts",
+    "RetryPolicy",
+    "SessionPool",
+    "Scheduler",
+]
+
+_EXPORTS = {
+    "Credentials": "auth",
+    "Lease": "auth",
+    "LeaseStore": "auth",
+    "Session": "auth",
+    "SessionPool": "pool",
+    "RetryPolicy": "retry",
+    "Scheduler": "scheduler",
+    "AsyncGrpcTts": "tts",
+    "GrpcTts": "tts",
+    "HyperParameters": "tts",
+    "JobParameters": "tts",
+    "TtsParams": "tts",
+    "Format": "tts",
+    "Quality": "tts",
+}
+
+
+def __getattr__(name: str):
+    try:
+        module = import_module(f".{_EXPORTS[name]}", __name__)
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = globals()[name] = getattr(module, name)
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | _EXPORTS.keys())
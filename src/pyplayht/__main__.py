@@ -1,92 +1,416 @@
 """Basic CLI runner that takes text on stdin and streams wav data on stdout."""
 
+import argparse
+import codecs
 import fileinput
 import io
 import sys
-import textwrap
-from contextlib import redirect_stdout
-
-from . import GrpcTts
-
-LINE_LIMIT = 6
-SOFT_CHARACTER_MAX = 350
-HARD_CHARACTER_MAX = 500
-
-__wrapper = textwrap.TextWrapper(
-    width=HARD_CHARACTER_MAX,
-    expand_tabs=False,
-    replace_whitespace=True,
-    fix_sentence_endings=True,
-    break_long_words=False,
-    drop_whitespace=True,
-    break_on_hyphens=False,
-    max_lines=LINE_LIMIT,
-)
-# noinspection PyProtectedMember
-__chunk_splitter = __wrapper._split_chunks
-
-SENTENCE_END_SEARCH = __wrapper.sentence_end_re.search
-WHITESPACE_TRANS = {}.fromkeys(__wrapper.unicode_whitespace_trans)
-
-
-def ensure_limits(
-    line: str, sentence_threshold=SOFT_CHARACTER_MAX, word_threshold=HARD_CHARACTER_MAX
-) -> list[str]:
-    """Given a line, split it by sentences if it is over length sentence_threshold.
-    If it is still over, split it by word_threshold if it is still over length word_threshold.
-
-    :param line: Line of text with sentence punctuation.
-    :param sentence_threshold: Length to begin splitting by sentences.
-    :param word_threshold: Length to begin splitting by words.
-    :returns list[str]: Lines of text split by sentences.
-
-    >>>
-    """
-    chunks = (
-        chunk for chunk in __chunk_splitter(line) if chunk.translate(WHITESPACE_TRANS)
-    )
-    return chunks
-    line_count = 0
-    while line_count < min(max_lines, LINE_LIMIT):
-        for line in texts:
-            line_count += 1
-            if len(line) > SOFT_CHARACTER_MAX:
-                for line in break_by_sentence(line):
-                    line_count += 1
-                    if len(line) > HARD_CHARACTER_MAX:
-                        for line in break_by_words(new_line):
-                            line_count += 1
-                            lines_to_speek.append(line) + 1
-
-
-def turn_batch(tts: GrpcTts, texts: io.TextIOBase | list[str], output: io.BytesIO):
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from queue import SimpleQueue
+from typing import Iterator
+
+from . import Credentials, GrpcTts, LeaseStore, Session
+from .container import WavMuxer
+from .incremental import synthesize_incremental
+from .pool import SessionPool
+from .proxy import serve
+from .spool import Spool, synthesize_spooled
+from .text import LINE_LIMIT, batched, ensure_limits
+from .workers import WorkerPool
+from .writer import CoalescingWriter
+
+
+def synthesize_to(tts: GrpcTts, batch: list[str], chunks: SimpleQueue):
+    """Put the audio bytes of batch into chunks, then None (or the raised exception)."""
+    try:
+        for tts_response in tts(batch):
+            chunks.put(tts_response.data)
+    except Exception as error:
+        chunks.put(error)
+    else:
+        chunks.put(None)
+
+
+def drain(chunks: SimpleQueue, output: io.BytesIO):
+    """Write the audio bytes from chunks into output, until the end of its stream."""
+    while (chunk := chunks.get()) is not None:
+        if isinstance(chunk, Exception):
+            raise chunk
+        output.write(chunk)
+
+
+def turn_batch(
+    tts: GrpcTts,
+    texts: io.TextIOBase | list[str],
+    output: io.BytesIO,
+    concurrency: int = 1,
+):
     """Using tts, parse the iterable of text lines (file object or other iterable), and produce bytes into the binary output file.
-    Reads up to max_lines (no more than LINE_LIMIT) of max_characters per line.
-    Breaks up lines longer than SOFT_CHARACTER_MAX at sentence endings, or 500 at word endings.
+    Sends up to LINE_LIMIT chunks of text per request.
+    Breaks up lines longer than SOFT_CHARACTER_MAX at sentence endings, or HARD_CHARACTER_MAX at word endings.
+    With concurrency over 1, keeps that many requests in flight and writes their audio in input order.
+    Audio is written without flushing; give a CoalescingWriter as output to bound its latency.
 
 
     :param tts: GrpcTts client instance
     :param texts: Text file stream
     :param output:  Binary file stream
+    :param concurrency: Number of requests in flight
     :return: None
     """
-    for line in ensure_limits(texts):
-        GrpcTts()
+    chunks = (chunk for line in texts for chunk in ensure_limits(line))
+    if concurrency <= 1:
+        for batch in batched(chunks, LINE_LIMIT):
+            for tts_response in tts(batch):
+                output.write(tts_response.data)
+        return
+    with ThreadPoolExecutor(concurrency, thread_name_prefix="pyplayht") as executor:
+        window: deque[SimpleQueue] = deque()
+        for batch in batched(chunks, LINE_LIMIT):
+            if len(window) == concurrency:
+                drain(window.popleft(), output)
+            window.append(SimpleQueue())
+            executor.submit(synthesize_to, tts, batch, window[-1])
+        while window:
+            drain(window.popleft(), output)
+
+
+@contextmanager
+def open_output(
+    flush_ms: float = 20, flush_bytes: int = 256 * 2**10, immediate: bool = False
+) -> Iterator[WavMuxer]:
+    """Open stdout for one audio stream, written in batches.
+
+    :param flush_ms: Milliseconds audio may wait to be batched into one write
+    :param flush_bytes: Pending bytes that trigger a write
+    :param immediate: Write every chunk as it arrives (interactive playback)
+    """
+    with open(sys.stdout.fileno(), "wb", buffering=0, closefd=False) as stdout_b:
+        with CoalescingWriter(
+            stdout_b, flush_ms / 1000, flush_bytes, immediate
+        ) as writer:
+            with WavMuxer(writer) as output:
+                yield output
+
+
+def pipeline_batch(
+    tts: GrpcTts,
+    files: list[str] = None,
+    concurrency: int = 1,
+    flush_ms: float = 20,
+    flush_bytes: int = 256 * 2**10,
+    immediate: bool = False,
+):
+    """Pipeline TTS: read in lines of text until EOF, push out one audio stream
+
+    :param tts: GrpcTts client instance
+    :param files: Text files to read (default: stdin)
+    :param concurrency: Number of requests in flight
+    :param flush_ms: Milliseconds audio may wait to be batched into one write
+    :param flush_bytes: Pending bytes that trigger a write
+    :param immediate: Write every chunk as it arrives (interactive playback)
+    """
+    texts = fileinput.input(files, encoding="utf-8")
+    with open_output(flush_ms, flush_bytes, immediate) as output:
+        turn_batch(tts, texts, output, concurrency)
+
+
+def pipeline_spool(
+    tts: GrpcTts,
+    directory: str,
+    files: list[str] = None,
+    concurrency: int = 1,
+    flush_ms: float = 20,
+    flush_bytes: int = 256 * 2**10,
+    immediate: bool = False,
+):
+    """Pipeline TTS through a resumable spool: synthesize the missing segments, then push out one audio stream
+
+    :param tts: GrpcTts client instance
+    :param directory: Spool directory, kept between runs to resume
+    :param files: Text files to read (default: stdin)
+    :param concurrency: Number of requests in flight
+    :param flush_ms: Milliseconds audio may wait to be batched into one write
+    :param flush_bytes: Pending bytes that trigger a write
+    :param immediate: Write every chunk as it arrives (interactive playback)
+    """
+    texts = fileinput.input(files, encoding="utf-8")
+    chunks = (chunk for line in texts for chunk in ensure_limits(line))
+    with Spool(directory) as spool:
+        reused = synthesize_spooled(
+            tts, batched(chunks, LINE_LIMIT), spool, concurrency
+        )
+        print(
+            f"pyplayht: {reused} of {len(spool.segments)} segments reused from {directory}",
+            file=sys.stderr,
+        )
+        with open_output(flush_ms, flush_bytes, immediate) as output:
+            spool.assemble(output)
+
+
+def pipeline_workers(
+    session: Session,
+    files: list[str] = None,
+    workers: int = None,
+    concurrency: int = 1,
+    flush_ms: float = 20,
+    flush_bytes: int = 256 * 2**10,
+    immediate: bool = False,
+):
+    """Pipeline TTS across worker processes: shard lines of text, push out one audio stream
+
+    :param session: Grant Session whose lease the workers share
+    :param files: Text files to read (default: stdin)
+    :param workers: Worker processes (default: one per CPU)
+    :param concurrency: Requests in flight per worker
+    :param flush_ms: Milliseconds audio may wait to be batched into one write
+    :param flush_bytes: Pending bytes that trigger a write
+    :param immediate: Write every chunk as it arrives (interactive playback)
+    """
+    texts = fileinput.input(files, encoding="utf-8")
+    with WorkerPool(session, workers=workers, concurrency=concurrency) as pool:
+        with open_output(flush_ms, flush_bytes, immediate) as output:
+            pool.write(texts, output)
+
+
+def read_fragments(files: list[str] = None, size: int = 4096) -> Iterator[str]:
+    """Yield text as soon as it can be read: lines of files, or whatever stdin has."""
+    if files and files != ["-"]:
+        yield from fileinput.input(files, encoding="utf-8")
+        return
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    while data := sys.stdin.buffer.read1(size):
+        yield decoder.decode(data)
+    yield decoder.decode(b"", final=True)
+
+
+def pipeline_incremental(
+    tts: GrpcTts,
+    files: list[str] = None,
+    concurrency: int = 2,
+    max_wait: float = None,
+    flush_ms: float = 20,
+    flush_bytes: int = 256 * 2**10,
+    immediate: bool = False,
+):
+    """Pipeline TTS incrementally: speak each sentence as soon as it is read
+
+    :param tts: GrpcTts client instance
+    :param files: Text files to read (default: stdin)
+    :param concurrency: Segments synthesized ahead of the one being written
+    :param max_wait: Seconds text may wait for its sentence to end
+    :param flush_ms: Milliseconds audio may wait to be batched into one write
+    :param flush_bytes: Pending bytes that trigger a write
+    :param immediate: Write every chunk as it arrives (interactive playback)
+    """
+    fragments = read_fragments(files)
+    with open_output(flush_ms, flush_bytes, immediate) as output:
+        for tts_response in synthesize_incremental(
+            tts, fragments, concurrency, max_wait
+        ):
+            output.write(tts_response.data)
+
+
+def run_proxy(tts: GrpcTts, address: str = "localhost:50051", max_streams: int = 64):
+    """Serve the Tts service locally until interrupted, forwarding through tts.
+
+    :param tts: GrpcTts client instance
+    :param address: Address to bind, "host:port" or "unix:path"
+    :param max_streams: Concurrent client streams
+    """
+    server, target = serve(tts, address, max_streams)
+    print(f"pyplayht: serving Tts on {target}", file=sys.stderr)
+    try:
+        server.wait_for_termination()
+    except KeyboardInterrupt:
+        server.stop(grace=5).wait()
+
+
+def parse_serve_args(argv: list[str] = None) -> argparse.Namespace:
+    """Parse the CLI arguments of `pyplayht serve`."""
+    parser = argparse.ArgumentParser(
+        prog="pyplayht serve",
+        description="Local Tts proxy: clients share one lease and warm upstream channels.",
+    )
+    parser.add_argument(
+        "-l",
+        "--listen",
+        default="localhost:50051",
+        metavar="ADDRESS",
+        help="host:port or unix:path to serve on (default: localhost:50051)",
+    )
+    parser.add_argument(
+        "--max-streams",
+        type=int,
+        default=64,
+        metavar="N",
+        help="concurrent client streams (default: 64)",
+    )
+    parser.add_argument(
+        "--pool-size",
+        type=int,
+        default=2,
+        metavar="N",
+        help="upstream channels to spread streams across (default: 2)",
+    )
+    parser.add_argument(
+        "--env-prefix",
+        default="PLAY_HT_",
+        metavar="PREFIX",
+        help="environment prefix of the account's USER_ID and API_KEY (default: PLAY_HT_)",
+    )
+    return parser.parse_args(argv)
 
 
-def pipeline_batch(tts: GrpcTts):
-    """Pipeline TTS: read in lines of text until EOF, push out bytes"""
-    with open(sys.stdout.fileno(), "wb", closefd=False) as stdout_b:
-        for line in fileinput.input(encoding="utf-8"):
-            for tts_response in tts([line]):
-                stdout_b.write(tts_response.data)
-                stdout_b.flush()
+def parse_args(argv: list[str] = None) -> argparse.Namespace:
+    """Parse the CLI arguments."""
+    parser = argparse.ArgumentParser(prog="pyplayht", description=__doc__)
+    parser.add_argument(
+        "files", nargs="*", help="text files to read instead of stdin ('-' is stdin)"
+    )
+    parser.add_argument(
+        "-c",
+        "--concurrency",
+        type=int,
+        default=1,
+        metavar="N",
+        help="requests to keep in flight, output stays in input order (default: 1)",
+    )
+    parser.add_argument(
+        "--flush-ms",
+        type=float,
+        default=20,
+        metavar="MS",
+        help="longest wait to batch audio into one write (default: 20)",
+    )
+    parser.add_argument(
+        "--flush-bytes",
+        type=int,
+        default=256 * 2**10,
+        metavar="BYTES",
+        help="pending audio that triggers a write (default: 262144)",
+    )
+    parser.add_argument(
+        "--immediate",
+        action="store_true",
+        help="write audio as soon as it arrives, for interactive playback",
+    )
+    parser.add_argument(
+        "-i",
+        "--incremental",
+        action="store_true",
+        help="speak each sentence as soon as it is read, for text that is still being written",
+    )
+    parser.add_argument(
+        "--max-wait",
+        type=float,
+        metavar="SECONDS",
+        help="with --incremental, longest wait for a sentence to end (default: no limit)",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        metavar="N",
+        help="shard the text across N processes, each keeping --concurrency requests in flight",
+    )
+    parser.add_argument(
+        "--spool",
+        metavar="DIR",
+        help="spool audio in DIR and resume from it when run again (written out at the end)",
+    )
+    parser.add_argument(
+        "--env-prefix",
+        nargs="+",
+        default=["PLAY_HT_"],
+        metavar="PREFIX",
+        help="environment prefixes of the accounts to spread requests across (default: PLAY_HT_)",
+    )
+    args = parser.parse_args(argv)
+    if args.workers is not None and (args.incremental or len(args.env_prefix) > 1):
+        parser.error("--workers works with one --env-prefix, without --incremental")
+    if args.spool and (args.incremental or args.workers is not None):
+        parser.error("--spool works without --incremental and --workers")
+    return args
 
 
-def main():
-    """Main CLI runner. STDIN for text, STDOUT for WAV bytestream."""
-    tts = GrpcTts.default()
-    pipeline_batch(tts)
+def main(argv: list[str] = None):
+    """Main CLI runner. STDIN for text, STDOUT for WAV bytestream; or `serve` a local proxy."""
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["serve"]:
+        args = parse_serve_args(argv[1:])
+        session = Session.default(
+            credentials=Credentials.default(env_prefix=args.env_prefix),
+            refresh_ahead=300,
+            store=LeaseStore.default(),
+        )
+        with GrpcTts(session, pool_size=args.pool_size) as tts:
+            tts.warm()
+            run_proxy(tts, args.listen, args.max_streams)
+        return
+    args = parse_args(argv)
+    if args.workers is not None:
+        pipeline_workers(
+            Session.default(
+                credentials=Credentials.default(env_prefix=args.env_prefix[0]),
+                store=LeaseStore.default(),
+            ),
+            args.files,
+            args.workers,
+            args.concurrency,
+            args.flush_ms,
+            args.flush_bytes,
+            args.immediate,
+        )
+        return
+    # resume a spool with the voice and seed it was started with
+    saved = Spool.saved_params(args.spool) if args.spool else None
+    params = () if saved is None else (saved,)
+    if len(args.env_prefix) > 1:
+        tts = SessionPool.default(
+            *params, env_prefixes=args.env_prefix, store=LeaseStore.default()
+        )
+    else:
+        tts = GrpcTts.default(
+            Session.default(
+                credentials=Credentials.default(env_prefix=args.env_prefix[0]),
+                store=LeaseStore.default(),
+            ),
+            *params,
+        )
+    if args.spool:
+        pipeline_spool(
+            tts,
+            args.spool,
+            args.files,
+            args.concurrency,
+            args.flush_ms,
+            args.flush_bytes,
+            args.immediate,
+        )
+        return
+    if args.incremental:
+        pipeline_incremental(
+            tts,
+            args.files,
+            max(args.concurrency, 2),
+            args.max_wait,
+            args.flush_ms,
+            args.flush_bytes,
+            args.immediate,
+        )
+        return
+    pipeline_batch(
+        tts,
+        args.files,
+        args.concurrency,
+        args.flush_ms,
+        args.flush_bytes,
+        args.immediate,
+    )
 
 
-main()
+if __name__ == "__main__":
+    main()
@@ -4,16 +4,35 @@ from .logging_config import log_call, logging
 
 logger = logging.getLogger(__name__)
 
+import inspect
 import json
+import os
+import tempfile
+import threading
+import weakref
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
+from pathlib import Path
 from struct import Struct
-from typing import Annotated, Any, Callable
+from struct import error as StructError
+from time import monotonic, perf_counter
+from typing import Annotated, Any, Callable, Iterator
 from urllib import request
+from urllib.parse import quote
 
-from dotenv import dotenv_values
+from .metrics import METRICS, Metrics
 
-__all__ = ["Credentials", "Lease", "Session"]
+try:
+    import fcntl
+except ImportError:  # not POSIX
+    fcntl = None
+
+__all__ = ["Credentials", "Lease", "LeaseStore", "Session"]
+
+# refresh_ahead of a Session sharing a LeaseStore: a stored lease within
+# Lease.grace_secs of expiring would otherwise be adopted by every new process
+STORE_REFRESH_AHEAD = 300
 
 # parse lease freshness (created, duration)
 _get_freshness: Callable[[Annotated[bytes, 72]], tuple[int, int]] = Struct(
@@ -43,6 +62,8 @@ class Credentials:
         cls, *, user_id: str = None, api_key: str = None, env_prefix="PLAY_HT_"
     ):
         """Create Credentials() with defaults from the environment (or override with keywords)"""
+        from dotenv import dotenv_values
+
         env_values: dict[str, str | None] = {
             name.removeprefix(env_prefix).lower(): value
             for name, value in dotenv_values().items()
@@ -102,6 +123,11 @@ class Lease:
         """Check Lease expiration against current system UTC and with a grade period"""
         return (datetime.now() - self.expires) > self.grace_secs
 
+    @log_call
+    def expires_within(self, margin: timedelta) -> bool:
+        """Check if the Lease expires within margin of the current system UTC"""
+        return datetime.now() >= self.expires - margin
+
     @log_call(include_result=False)
     def __call__(self) -> bytes:
         """Return the Lease byte string on calling."""
@@ -110,10 +136,71 @@ class Lease:
         return self.token
 
 
+class LeaseStore:
+    """On-disk Lease cache, keyed by user_id and shared between processes.
+
+    >>> LeaseStore('/tmp/leases').path('id')
+    PosixPath('/tmp/leases/id.lease')
+
+    :param directory: Directory holding one raw lease token file per user_id
+    """
+
+    def __init__(self, directory: str | os.PathLike):
+        self.directory = Path(directory)
+
+    @classmethod
+    def default(cls) -> "LeaseStore":
+        """Create a LeaseStore in the user cache directory ($XDG_CACHE_HOME or ~/.cache)"""
+        cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+        return cls(Path(cache_home) / "pyplayht" / "leases")
+
+    def path(self, user_id: str) -> Path:
+        """Return the token file path for user_id."""
+        return self.directory / f"{quote(user_id, safe='')}.lease"
+
+    @log_call(include_args=["user_id"], include_result=False)
+    def load(self, user_id: str) -> Lease | None:
+        """Return the stored Lease for user_id, or None if missing, unreadable or expired."""
+        try:
+            return Lease(self.path(user_id).read_bytes())
+        except (OSError, ValueError, StructError):
+            return None
+
+    @log_call(include_args=["user_id"])
+    def save(self, user_id: str, lease: Lease):
+        """Atomically replace the stored lease token for user_id (readable by owner only)."""
+        self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with open(fd, "wb") as temp_file:
+                temp_file.write(lease.token)
+            os.replace(temp_path, self.path(user_id))
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    @contextmanager
+    def locked(self, user_id: str) -> Iterator[None]:
+        """Hold an exclusive inter-process lock for user_id (a no-op without fcntl)."""
+        if fcntl is None:
+            yield
+            return
+        self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+        with open(self.path(user_id).with_suffix(".lock"), "wb") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
 class Session:
     """Grants session access by authorizing fresh a fresh Lease when needed"""
 
     timeout = 60
+    metrics: Metrics = METRICS
+    refresh_ahead: timedelta = None
+    refresh_retry_secs = 5
 
     @log_call
     def __init__(
@@ -121,6 +208,9 @@ class Session:
         credentials: Credentials,
         url="https://api.play.ht/api/v2/leases",
         timeout=60,
+        refresh_ahead: float = None,
+        store: LeaseStore = None,
+        lease: Lease = None,
     ):
         """Initialize the Session.
 
@@ -136,8 +226,18 @@ class Session:
         :param credentials: Grant object with UserId and APIKey (default: load from Environment)
         :param url: Authentication URL (default "https://api.play.ht/api.v2/leases")
         :param timeout: HTTP timeout to wait for a response (default 60)
+        :param refresh_ahead: Seconds before expiration to renew the lease in the background (default: STORE_REFRESH_AHEAD with a store, else refresh inline once expired)
+        :param store: LeaseStore to share leases with other processes (default: no persistence)
+        :param lease: Lease to start with, for example handed over by a parent process (default: fetch on first use)
         """
         self.timeout = timeout
+        self.credentials = credentials
+        self.user_id = credentials.user_id
+        self.store = store
+        if refresh_ahead is None and store is not None:
+            refresh_ahead = STORE_REFRESH_AHEAD
+        if refresh_ahead is not None:
+            self.refresh_ahead = timedelta(seconds=refresh_ahead)
         self.request = request.Request(
             url,
             headers={
@@ -146,7 +246,12 @@ class Session:
             },
             method="POST",
         )
-        self.__lease: Lease = None
+        self.__lease: Lease = lease
+        self.__async_lock = None
+        self.__refresh_lock = threading.Lock()
+        self.__refresh_timer: threading.Timer = None
+        self.__background_after = 0.0
+        self.__listeners: list[Callable[[], Callable[[Lease], None] | None]] = []
 
     @classmethod
     @log_call(include_result=False, include_args=["url", "timeout"])
@@ -156,6 +261,8 @@ class Session:
         credentials: Credentials = None,
         url="https://api.play.ht/api/v2/leases",
         timeout=60,
+        refresh_ahead: float = None,
+        store: LeaseStore = None,
     ):
         """Initialize the Session with defaults (and optional keyword overrides)
 
@@ -171,26 +278,184 @@ class Session:
         :param credentials: Grant object with UserId and APIKey (default: load from Environment)
         :param url: Authentication URL (default "https://api.play.ht/api.v2/leases")
         :param timeout: HTTP timeout to wait for a response (default 60)
+        :param refresh_ahead: Seconds before expiration to renew the lease in the background (default: STORE_REFRESH_AHEAD with a store, else refresh inline once expired)
+        :param store: LeaseStore to share leases with other processes (default: no persistence)
         """
         credentials = credentials or Credentials.default()
-        return cls(credentials, url, timeout)
+        return cls(credentials, url, timeout, refresh_ahead, store)
 
     @property
     @log_call(include_result=False)
     def lease(self) -> Lease:
         """Return the existing lease or attempt to refresh a new one.
 
+        Only callers without a usable lease wait on the auth server, and they
+        all share one in-flight refresh. With refresh_ahead, a lease nearing
+        expiration is renewed in the background while it is still served.
+
         :return: a Lease instance
         """
-        if not self.__lease or self.__lease.is_expired():
-            self._refresh()
+        lease = self.__lease
+        if not lease or lease.is_expired():
+            self._refresh_stale(lease)
+        elif self.refresh_ahead is not None and lease.expires_within(
+            self.refresh_ahead
+        ):
+            self._refresh_background()
         return self.__lease
 
+    @log_call(include_result=False)
+    async def alease(self) -> Lease:
+        """Return the existing lease or refresh a new one without blocking the event loop.
+
+        Concurrent coroutines share a single in-flight refresh.
+
+        :return: a Lease instance
+        """
+        lease = self.__lease
+        if not lease or lease.is_expired():
+            import asyncio
+
+            self.__async_lock = self.__async_lock or asyncio.Lock()
+            async with self.__async_lock:
+                await asyncio.to_thread(self._refresh_stale, lease)
+            return self.__lease
+        return self.lease
+
+    @log_call(include_result=False)
+    def invalidate(self, rejected: Lease) -> Lease:
+        """Replace a lease the server rejected, and return the new lease.
+
+        Callers rejected with the same lease share one refresh.
+
+        :param rejected: The lease the server refused
+        :return: a Lease instance
+        """
+        self._refresh_stale(rejected)
+        return self.__lease
+
+    def _refresh_stale(self, stale: Lease):
+        """Refresh the lease, unless another caller already replaced stale."""
+        with self.__refresh_lock:
+            if self.__lease is stale:
+                self._refresh()
+
+    def _refresh_background(self):
+        """Start a background refresh, unless one is already in flight."""
+        if monotonic() < self.__background_after:
+            return
+        if not self.__refresh_lock.acquire(blocking=False):
+            return
+        threading.Thread(
+            target=self._refresh_release, name="pyplayht-lease-refresh", daemon=True
+        ).start()
+
+    def _refresh_release(self):
+        """Refresh the lease (while holding the refresh lock), then release it."""
+        try:
+            if self._is_stale(self.__lease):
+                self._refresh()
+        except Exception:
+            self.__background_after = monotonic() + self.refresh_retry_secs
+            logger.exception("Background lease refresh failed")
+        finally:
+            self.__refresh_lock.release()
+
+    def _schedule_refresh(self):
+        """Schedule a background refresh at refresh_ahead before expiration."""
+        if self.__refresh_timer:
+            self.__refresh_timer.cancel()
+        delay = self.__lease.expires - self.refresh_ahead - datetime.now()
+        self.__refresh_timer = threading.Timer(
+            max(delay.total_seconds(), 0), self._refresh_background
+        )
+        self.__refresh_timer.daemon = True
+        self.__refresh_timer.start()
+
+    def _is_stale(self, lease: Lease | None) -> bool:
+        """Check if lease is missing, expired or due for a refresh-ahead."""
+        return (
+            not lease
+            or lease.is_expired()
+            or (
+                self.refresh_ahead is not None
+                and lease.expires_within(self.refresh_ahead)
+            )
+        )
+
+    def _fetch(self) -> Lease:
+        """Request a new lease from the auth server."""
+        start = perf_counter()
+        try:
+            with request.urlopen(self.request, timeout=self.timeout) as token:
+                return Lease(token.read())
+        except Exception:
+            self.metrics.counter(
+                "pyplayht_lease_refresh_errors_total", "Lease requests that failed"
+            ).inc()
+            raise
+        finally:
+            self.metrics.histogram(
+                "pyplayht_lease_refresh_seconds", "Lease request duration"
+            ).observe(perf_counter() - start)
+
     @log_call
     def _refresh(self):
-        """Refresh the lease unconditionally."""
-        with request.urlopen(self.request, timeout=self.timeout) as token:
-            self.__lease = Lease(token.read())
+        """Refresh the lease unconditionally, or adopt a fresher one from the store."""
+        if self.store is None:
+            self.__lease = self._fetch()
+        else:
+            with self.store.locked(self.user_id):
+                lease = self.store.load(self.user_id)
+                if lease == self.__lease or self._is_stale(lease):
+                    lease = self._fetch()
+                    self.store.save(self.user_id, lease)
+                self.__lease = lease
+        self.__background_after = 0.0
+        if self.refresh_ahead is not None:
+            self._schedule_refresh()
+        self._notify(self.__lease)
+
+    def close(self):
+        """Cancel any scheduled background refresh."""
+        if self.__refresh_timer:
+            self.__refresh_timer.cancel()
+            self.__refresh_timer = None
+
+    def add_listener(self, listener: Callable[[Lease], None]):
+        """Call listener with every new Lease after a refresh.
+
+        A bound method is only weakly referenced: its object may be collected
+        without remove_listener, and the listener is then dropped.
+        """
+        if inspect.ismethod(listener):
+            self.__listeners.append(weakref.WeakMethod(listener, self._forget))
+        else:
+            self.__listeners.append(lambda: listener)
+
+    def remove_listener(self, listener: Callable[[Lease], None]):
+        """Stop calling listener after a refresh."""
+        for ref in list(self.__listeners):
+            if ref() == listener:
+                self._forget(ref)
+
+    def _forget(self, ref: Callable[[], Callable[[Lease], None] | None]):
+        """Drop a listener reference (also called when its object is collected)."""
+        try:
+            self.__listeners.remove(ref)
+        except ValueError:
+            pass
+
+    def _notify(self, lease: Lease):
+        """Pass a new Lease to the listeners."""
+        for ref in list(self.__listeners):
+            listener = ref()
+            if listener is None:
+                continue
+            try:
+                listener(lease)
+            except Exception:
+                logger.exception("Lease listener %r failed", listener)
 
     @log_call(include_result=False)
     def __call__(self) -> Lease:
@@ -0,0 +1,185 @@
+"""Content-addressed TtsResponse stream cache"""
+
+from .logging_config import log_call, logging
+
+logger = logging.getLogger(__name__)
+
+import os
+import struct
+import tempfile
+import threading
+from collections import OrderedDict
+from hashlib import sha256
+from pathlib import Path
+from struct import Struct
+from typing import Iterable, Iterator
+
+from .api_pb2 import TtsParams, TtsResponse
+
+__all__ = ["AudioCache"]
+
+# length prefix of each serialized TtsResponse in a cache file
+_frame = Struct(">L")
+
+
+class AudioCache:
+    """Cache of complete TtsResponse streams, keyed by the request's TtsParams.
+
+    An in-memory LRU tier is bounded by max_bytes; an optional on-disk tier
+    in directory keeps streams across processes and evictions. The on-disk
+    tier is bounded by max_disk_bytes, removing the least recently used
+    files beyond it; without it, the tier grows until pruned by hand.
+    Unreadable (truncated or corrupt) files count as misses and are removed.
+
+    >>> cache = AudioCache(max_bytes=8)
+    >>> cache.put('k', [b'1234', b'5678'])
+    >>> cache.get('k')
+    [b'1234', b'5678']
+    >>> cache.put('j', [b'9'])
+    >>> cache.get('k') is None, cache.size
+    (True, 1)
+
+    :param max_bytes: Memory tier capacity, in serialized bytes
+    :param directory: Directory for the on-disk tier (default: memory only)
+    :param max_disk_bytes: On-disk tier capacity, in file bytes (default: no limit)
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 2**20,
+        directory: str = None,
+        max_disk_bytes: int = None,
+    ):
+        self.max_bytes = max_bytes
+        self.directory = Path(directory) if directory else None
+        self.max_disk_bytes = max_disk_bytes
+        self._disk_size: int = None  # measured on the first prune
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, list[bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(params: TtsParams, texts: list[str] = ()) -> str:
+        """Return the cache key for a canonical serialization of params and texts.
+
+        >>> AudioCache.key(TtsParams(voice='v'), ['a']) == AudioCache.key(TtsParams(voice='v'), ['b'])
+        False
+        """
+        digest = sha256(params.SerializeToString(deterministic=True))
+        digest.update(TtsParams(text=texts).SerializeToString())
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / key
+
+    @log_call(include_result=False)
+    def get(self, key: str) -> list[bytes] | None:
+        """Return the serialized TtsResponse chunks stored under key, if any."""
+        with self._lock:
+            chunks = self._entries.get(key)
+            if chunks is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return chunks
+        chunks = self._load(key) if self.directory else None
+        with self._lock:
+            if chunks is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, chunks)
+        return chunks
+
+    @log_call(include_args=["key"])
+    def put(self, key: str, chunks: list[bytes]):
+        """Store the serialized TtsResponse chunks of a complete stream under key."""
+        with self._lock:
+            self._remember(key, chunks)
+        if self.directory:
+            self._store(key, chunks)
+
+    def _remember(self, key: str, chunks: list[bytes]):
+        """Add chunks to the memory tier and evict least recently used (hold the lock)."""
+        size = sum(map(len, chunks))
+        if size > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.size -= sum(map(len, previous))
+        self._entries[key] = chunks
+        self.size += size
+        while self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= sum(map(len, evicted))
+
+    def _load(self, key: str) -> list[bytes] | None:
+        """Read a stream from the on-disk tier (None if missing or unreadable)."""
+        path = self._path(key)
+        try:
+            data = memoryview(path.read_bytes())
+            if self.max_disk_bytes is not None:
+                os.utime(path)  # mark as recently used
+        except OSError:
+            return None
+        chunks, offset = [], 0
+        try:
+            while offset < len(data):
+                (length,) = _frame.unpack_from(data, offset)
+                offset += _frame.size
+                if offset + length > len(data):
+                    raise struct.error("truncated chunk")
+                chunks.append(bytes(data[offset : offset + length]))
+                offset += length
+        except struct.error:
+            logger.warning("Removing corrupt audio cache file %s", path)
+            path.unlink(missing_ok=True)
+            return None
+        return chunks
+
+    def _store(self, key: str, chunks: list[bytes]):
+        """Atomically write a stream to the on-disk tier."""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with open(fd, "wb") as temp_file:
+                for chunk in chunks:
+                    temp_file.write(_frame.pack(len(chunk)))
+                    temp_file.write(chunk)
+            os.replace(temp_path, path)
+        except OSError:
+            os.unlink(temp_path)
+            logger.exception("Unable to store %s in the audio cache", key)
+            return
+        if self.max_disk_bytes is not None:
+            with self._lock:
+                if self._disk_size is not None:
+                    self._disk_size += path.stat().st_size
+                if self._disk_size is None or self._disk_size > self.max_disk_bytes:
+                    self.prune()
+
+    def prune(self):
+        """Remove the least recently used on-disk files beyond max_disk_bytes."""
+        files = []
+        for path in self.directory.glob("*/*"):
+            if path.suffix == ".tmp":
+                continue  # being written
+            try:
+                files.append((path.stat(), path))
+            except OSError:
+                continue
+        files.sort(key=lambda file: file[0].st_mtime)
+        size = sum(stat.st_size for stat, _ in files)
+        for stat, path in files:
+            if size <= self.max_disk_bytes:
+                break
+            path.unlink(missing_ok=True)
+            size -= stat.st_size
+        self._disk_size = size
+
+    @staticmethod
+    def replay(chunks: Iterable[bytes]) -> Iterator[TtsResponse]:
+        """Replay stored chunks as a TtsResponse stream."""
+        return map(TtsResponse.FromString, chunks)
@@ -0,0 +1,263 @@
+"""gRPC Channel pooling"""
+
+from .logging_config import log_call, logging
+
+logger = logging.getLogger(__name__)
+
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from itertools import count
+from time import monotonic
+from typing import Any, Callable, Iterator
+
+from grpc import (
+    Channel,
+    ChannelConnectivity,
+    ChannelCredentials,
+    Compression,
+    FutureTimeoutError,
+    RpcError,
+    StatusCode,
+    channel_ready_future,
+    secure_channel,
+    ssl_channel_credentials,
+)
+
+__all__ = ["ChannelPool", "PooledChannel", "LEAST_OUTSTANDING", "ROUND_ROBIN"]
+
+LEAST_OUTSTANDING = "least_outstanding"
+ROUND_ROBIN = "round_robin"
+# give every pooled channel its own connection instead of grpc's shared subchannel
+POOL_OPTIONS = (("grpc.use_local_subchannel_pool", 1),)
+BROKEN_STATES = frozenset(
+    (ChannelConnectivity.TRANSIENT_FAILURE, ChannelConnectivity.SHUTDOWN)
+)
+# status codes after which the channel's own connection state is checked
+BROKEN_CODES = frozenset((StatusCode.UNAVAILABLE,))
+# grpc keeps polling a watched channel for up to 0.2s after the watch ends,
+# and its poller thread crashes if the channel is closed meanwhile
+POLL_GRACE = 0.5
+
+
+@dataclass(eq=False)
+class PooledChannel:
+    """A Channel, its stub and the number of streams currently using it."""
+
+    channel: Channel
+    stub: Callable
+    outstanding: int = field(default=0)
+    broken: bool = field(default=False)
+    retired: bool = field(default=False)
+    connectivity: ChannelConnectivity = field(default=None)
+    polled_until: float = field(default=0.0)
+
+    def _polled(self):
+        self.polled_until = monotonic() + POLL_GRACE
+
+    def probe(self, timeout: float = 1.0) -> ChannelConnectivity | None:
+        """Read the channel's connectivity state, without connecting it.
+
+        The channel is only watched for the probe, not for its lifetime.
+
+        :param timeout: Seconds to wait for grpc to report the state
+        :return: The last reported state (None if never reported)
+        """
+        reported = threading.Event()
+
+        def on_connectivity(state: ChannelConnectivity):
+            self.connectivity = state
+            reported.set()
+
+        self.channel.subscribe(on_connectivity)
+        try:
+            reported.wait(timeout)
+        finally:
+            self.channel.unsubscribe(on_connectivity)
+            self._polled()
+        return self.connectivity
+
+    def ready(self, timeout: float):
+        """Connect the channel, waiting up to timeout seconds for it.
+
+        :raises grpc.FutureTimeoutError: if the channel is not ready in time
+        """
+        ready = channel_ready_future(self.channel)
+        try:
+            ready.result(timeout)
+            self.connectivity = ChannelConnectivity.READY
+        finally:
+            ready.cancel()
+            self._polled()
+
+    def close(self):
+        """Close the channel, once grpc has stopped watching it."""
+        wait = self.polled_until - monotonic()
+        if wait <= 0:
+            self.channel.close()
+            return
+        timer = threading.Timer(wait, self.channel.close)
+        timer.daemon = True
+        timer.start()
+
+
+class ChannelPool:
+    """Fixed-size pool of Channels to one target, spreading streams across them.
+
+    Each Channel is its own HTTP/2 connection, so aggregate throughput is not
+    capped by a single connection's stream and flow-control limits.
+    """
+
+    warm_timeout: float = 10
+
+    @log_call(include_args=["target", "size", "strategy"], include_result=False)
+    def __init__(
+        self,
+        target: str,
+        size: int = 1,
+        *,
+        stub_factory: Callable[[Channel], Callable],
+        options: tuple[tuple[str, Any], ...] = (),
+        credentials: ChannelCredentials = None,
+        compression: Compression = Compression.Gzip,
+        strategy: str = LEAST_OUTSTANDING,
+    ):
+        """Open size Channels to target.
+
+        :param target: Channel target (host:port)
+        :param size: Number of Channels (connections) to keep open
+        :param stub_factory: Create the RPC callable for a Channel
+        :param options: gRPC ChannelOptions
+        :param credentials: Channel credentials (default: SSL)
+        :param compression: Channel compression (default: Gzip)
+        :param strategy: LEAST_OUTSTANDING or ROUND_ROBIN
+        """
+        if size < 1:
+            raise ValueError("ChannelPool size must be at least 1")
+        if strategy not in (LEAST_OUTSTANDING, ROUND_ROBIN):
+            raise ValueError(f"Unknown ChannelPool strategy {strategy!r}")
+        self.target = target
+        self.size = size
+        self.stub_factory = stub_factory
+        self.options = tuple(options) + (POOL_OPTIONS if size > 1 else ())
+        self.credentials = credentials or ssl_channel_credentials()
+        self.compression = compression
+        self.strategy = strategy
+        self._lock = threading.Lock()
+        self._turn = count()
+        self._retargeting: str = None
+        self.entries: list[PooledChannel] = [self._open(target) for _ in range(size)]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _open(self, target: str) -> PooledChannel:
+        """Open a new Channel to target."""
+        channel = secure_channel(
+            target,
+            credentials=self.credentials,
+            options=self.options,
+            compression=self.compression,
+        )
+        return PooledChannel(channel, self.stub_factory(channel))
+
+    @staticmethod
+    def _close(entry: PooledChannel):
+        """Close a Channel that no stream is using anymore."""
+        entry.close()
+
+    def _retire(self, entry: PooledChannel):
+        """Drop entry from the pool, closing it once its streams are done."""
+        entry.retired = True
+        if not entry.outstanding:
+            self._close(entry)
+
+    def _pick(self) -> PooledChannel:
+        """Replace broken Channels, then select one by strategy (hold the lock)."""
+        for index, entry in enumerate(self.entries):
+            if entry.broken:
+                logger.warning("Replacing broken channel to %s", self.target)
+                self._retire(entry)
+                self.entries[index] = self._open(self.target)
+        if self.strategy == ROUND_ROBIN:
+            return self.entries[next(self._turn) % len(self.entries)]
+        return min(self.entries, key=lambda entry: entry.outstanding)
+
+    @contextmanager
+    def stub(self) -> Iterator[Callable]:
+        """Lease a stub for the duration of one stream.
+
+        :yield: RPC callable bound to the selected Channel
+        """
+        with self._lock:
+            entry = self._pick()
+            entry.outstanding += 1
+        try:
+            yield entry.stub
+        except RpcError as error:
+            # UNAVAILABLE may come from a server on a healthy connection:
+            # only replace a channel whose connection actually failed
+            if error.code() in BROKEN_CODES and entry.probe() in BROKEN_STATES:
+                entry.broken = True
+            raise
+        finally:
+            with self._lock:
+                entry.outstanding -= 1
+                if entry.retired and not entry.outstanding:
+                    self._close(entry)
+
+    @log_call(include_result=False)
+    def warm(self, timeout: float = None):
+        """Connect all Channels now, so the first streams skip TLS and HTTP/2 setup.
+
+        :param timeout: Seconds to wait for the Channels (default: warm_timeout)
+        :raises grpc.FutureTimeoutError: if a Channel is not ready in time
+        """
+        timeout = self.warm_timeout if timeout is None else timeout
+        for entry in list(self.entries):
+            entry.ready(timeout)
+
+    @log_call(include_args=["target"], include_result=False)
+    def retarget(self, target: str):
+        """Move the pool to a new target in the background.
+
+        New Channels are connected before any stream is sent to them, and the
+        old Channels are closed only after their active streams finish.
+        Nothing happens if the pool already targets (or is moving to) target.
+
+        :param target: New Channel target (host:port)
+        """
+        with self._lock:
+            if target in (self.target, self._retargeting):
+                return
+            self._retargeting = target
+        threading.Thread(
+            target=self._retarget, args=(target,), name="pyplayht-retarget", daemon=True
+        ).start()
+
+    def _retarget(self, target: str):
+        """Open and warm Channels to target, then swap them in."""
+        entries = [self._open(target) for _ in range(self.size)]
+        try:
+            for entry in entries:
+                entry.ready(self.warm_timeout)
+        except FutureTimeoutError:
+            logger.warning("Channel to %s not ready, keeping %s", target, self.target)
+            for entry in entries:
+                self._close(entry)
+            with self._lock:
+                self._retargeting = None
+            return
+        with self._lock:
+            old_entries, self.entries = self.entries, entries
+            self.target, self._retargeting = target, None
+            for entry in old_entries:
+                self._retire(entry)
+
+    @log_call(include_result=False)
+    def close(self):
+        """Close all Channels, cancelling their active streams."""
+        with self._lock:
+            entries, self.entries = self.entries, []
+        for entry in entries:
+            self._close(entry)
@@ -0,0 +1,251 @@
+"""Streaming audio containers (RIFF/WAVE)"""
+
+from .logging_config import log_call, logging
+
+logger = logging.getLogger(__name__)
+
+import io
+import os
+from dataclasses import dataclass, field
+from struct import Struct
+
+__all__ = ["WavFormat", "WavMuxer", "parse_wav_header", "wav_header"]
+
+# data size of a header written before the length of the stream is known
+STREAMING_SIZE = 0xFFFFFFFF
+WAVE_FORMAT_PCM = 1
+WAVE_FORMAT_IEEE_FLOAT = 3
+WAVE_FORMAT_ALAW = 6
+WAVE_FORMAT_MULAW = 7
+
+_riff = Struct("<4sL4s")
+_chunk = Struct("<4sL")
+_fmt = Struct("<HHLLHH")
+_header = Struct("<4sL4s4sLHHLLHH4sL")
+_size = Struct("<L")
+# offsets of the RIFF and data sizes in a header written by WavFormat.header
+RIFF_SIZE_OFFSET = 4
+DATA_SIZE_OFFSET = 40
+
+
+@dataclass(frozen=True)
+class WavFormat:
+    """Sample format of a WAVE stream."""
+
+    format_tag: int = field(default=WAVE_FORMAT_PCM)
+    channels: int = field(default=1)
+    sample_rate: int = field(default=24000)
+    bits_per_sample: int = field(default=16)
+
+    @property
+    def block_align(self) -> int:
+        return self.channels * self.bits_per_sample // 8
+
+    def header(self, data_size: int = STREAMING_SIZE) -> bytes:
+        """Return a 44 byte RIFF/WAVE header for data_size bytes of audio.
+
+        >>> header = WavFormat(sample_rate=8000).header(16000)
+        >>> len(header), header[:4], header[8:16], parse_wav_header(header)[1]
+        (44, b'RIFF', b'WAVEfmt ', 44)
+        """
+        data_size = min(data_size, STREAMING_SIZE)
+        return _header.pack(
+            b"RIFF", min(data_size + 36, STREAMING_SIZE), b"WAVE", b"fmt ", 16,
+            self.format_tag, self.channels, self.sample_rate,
+            self.sample_rate * self.block_align, self.block_align,
+            self.bits_per_sample, b"data", data_size,
+        )  # fmt: skip
+
+
+def wav_header(
+    sample_rate: int, data_size: int = STREAMING_SIZE, **wav_format
+) -> bytes:
+    """Return a 44 byte RIFF header (16-bit mono PCM and streaming size by default).
+
+    :param sample_rate: Samples per second
+    :param data_size: Bytes of audio following the header
+    :param **wav_format: Other WavFormat fields
+    """
+    return WavFormat(sample_rate=sample_rate, **wav_format).header(data_size)
+
+
+def parse_wav_header(data: bytes) -> tuple[WavFormat, int] | None:
+    """Parse the RIFF/WAVE header at the start of data.
+
+    >>> parse_wav_header(wav_header(8000))
+    (WavFormat(format_tag=1, channels=1, sample_rate=8000, bits_per_sample=16), 44)
+    >>> parse_wav_header(wav_header(8000)[:30]) is None
+    True
+
+    :param data: Start of a WAVE stream
+    :return: The stream's WavFormat and the offset of its audio, or None if
+        data holds only part of the header
+    :raises ValueError: if data is not a WAVE stream
+    """
+    if len(data) < _riff.size:
+        if not b"RIFF".startswith(bytes(data[:4])):
+            raise ValueError("Not a RIFF/WAVE stream")
+        return None
+    riff, _, wave = _riff.unpack_from(data)
+    if riff != b"RIFF" or wave != b"WAVE":
+        raise ValueError("Not a RIFF/WAVE stream")
+    offset, wav_format = _riff.size, None
+    while len(data) >= offset + _chunk.size:
+        chunk_id, size = _chunk.unpack_from(data, offset)
+        offset += _chunk.size
+        if chunk_id == b"data":
+            if wav_format is None:
+                raise ValueError("WAVE data chunk before its fmt chunk")
+            return wav_format, offset
+        if len(data) < offset + size:
+            return None
+        if chunk_id == b"fmt ":
+            format_tag, channels, sample_rate, _, _, bits = _fmt.unpack_from(
+                data, offset
+            )
+            wav_format = WavFormat(format_tag, channels, sample_rate, bits)
+        offset += size + (size & 1)
+    return None
+
+
+def _patchable(output: io.IOBase) -> bool:
+    """Check if output can be sought back to patch a header (and is not appending)."""
+    if not output.seekable():
+        return False
+    try:
+        import fcntl
+
+        return not fcntl.fcntl(output.fileno(), fcntl.F_GETFL) & os.O_APPEND
+    except (ImportError, OSError, io.UnsupportedOperation):
+        return True
+
+
+class WavMuxer:
+    """Join the audio of several WAVE streams into one WAVE stream on output.
+
+    Each TtsResponse stream (and each text in a request) may start with its
+    own RIFF header. The muxer strips those headers and writes a single
+    header up front, with streaming sizes; when output is seekable, close()
+    patches in the real sizes. Audio that does not start with a RIFF header
+    (FORMAT_RAW, FORMAT_MULAW, ...) passes through untouched. Audio is never
+    buffered, only a header split across chunks is.
+
+    A header whose data size is known is followed to the end of its audio,
+    so the next header is found even in the middle of a chunk. After a
+    header with a streaming size (0xFFFFFFFF) the end of its audio is
+    unknown, and the next header is only looked for at the start of a
+    chunk (where the Tts service starts each text).
+
+    >>> output = io.BytesIO()
+    >>> with WavMuxer(output) as muxer:
+    ...     for data in (wav_header(8000), b'\\x01\\x00', wav_header(8000)[:20], wav_header(8000)[20:] + b'\\x02\\x00'):
+    ...         _ = muxer.write(data)
+    >>> parse_wav_header(output.getvalue())[0].sample_rate, output.getvalue()[44:]
+    (8000, b'\\x01\\x00\\x02\\x00')
+    >>> output.getvalue()[DATA_SIZE_OFFSET:44]
+    b'\\x04\\x00\\x00\\x00'
+
+    Sized headers in the middle of a chunk:
+
+    >>> output = io.BytesIO()
+    >>> with WavMuxer(output) as muxer:
+    ...     _ = muxer.write(wav_header(8000, 2) + b'\\x01\\x00' + wav_header(8000, 2) + b'\\x02\\x00')
+    >>> output.getvalue()[44:]
+    b'\\x01\\x00\\x02\\x00'
+
+    :param output: Binary file to write to
+    """
+
+    def __init__(self, output: io.RawIOBase | io.BufferedIOBase):
+        self.output = output
+        self.format: WavFormat = None
+        self.passthrough: bool = None
+        self.data_size = 0
+        self._header_at: int = None
+        self._pending = b""
+        # audio bytes left in the current sized data chunk (None: unknown)
+        self._remaining: int = None
+
+    @log_call(include_args=[], include_result=False)
+    def write(self, data: bytes) -> int:
+        """Write a chunk of audio, stripping the RIFF headers in it.
+
+        :param data: Audio bytes, as received in TtsResponse.data
+        :return: len(data)
+        """
+        size = len(data)
+        if self._pending:
+            data, self._pending = self._pending + data, b""
+        data, at_start = memoryview(data), True
+        while data:
+            if self._remaining:
+                audio, data = data[: self._remaining], data[self._remaining :]
+                self._remaining -= len(audio)
+                self._write_audio(audio)
+                continue
+            if (
+                (at_start or self._remaining == 0)
+                and self.passthrough is not True
+                and data[:4] == b"RIFF"[: len(data[:4])]
+            ):
+                try:
+                    parsed = parse_wav_header(data)
+                except ValueError:
+                    parsed = False
+                if parsed is None:
+                    self._pending = bytes(data)
+                    return size
+                if parsed:
+                    wav_format, offset = parsed
+                    self._start(wav_format)
+                    (data_size,) = _size.unpack_from(data, offset - _size.size)
+                    self._remaining = None if data_size == STREAMING_SIZE else data_size
+                    data, at_start = data[offset:], False
+                    continue
+            if self.passthrough is None:
+                self.passthrough = True
+            self._remaining = None
+            self._write_audio(data)
+            break
+        return size
+
+    def _write_audio(self, data: memoryview):
+        if data:
+            self.output.write(data)
+            self.data_size += len(data)
+
+    def _start(self, wav_format: WavFormat):
+        """Write the stream's header, or check a later header's format matches it."""
+        if self.format is None:
+            self.format, self.passthrough = wav_format, False
+            if _patchable(self.output):
+                self._header_at = self.output.tell()
+            self.output.write(wav_format.header())
+        elif wav_format != self.format:
+            raise ValueError(f"WAVE format changed from {self.format} to {wav_format}")
+
+    def flush(self):
+        self.output.flush()
+
+    def close(self):
+        """Write any held back bytes and patch the header sizes if output is seekable."""
+        if self._pending:
+            data, self._pending = self._pending, b""
+            self.output.write(data)
+            self.data_size += len(data)
+        if self._header_at is not None:
+            end = self.output.tell()
+            data_size = min(self.data_size, STREAMING_SIZE)
+            self.output.seek(self._header_at + RIFF_SIZE_OFFSET)
+            self.output.write(_size.pack(min(data_size + 36, STREAMING_SIZE)))
+            self.output.seek(self._header_at + DATA_SIZE_OFFSET)
+            self.output.write(_size.pack(data_size))
+            self.output.seek(end)
+            self._header_at = None
+        self.output.flush()
+
+    def __enter__(self) -> "WavMuxer":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,252 @@
+"""Local stand-in for the PlayHT auth and gRPC Tts services (for tests and benchmarks)"""
+
+from .logging_config import log_call, logging
+
+logger = logging.getLogger(__name__)
+
+import json
+import math
+import os
+import threading
+import time
+from array import array
+from concurrent import futures
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from random import random
+from struct import Struct
+from uuid import uuid4
+
+import grpc
+
+from .api_pb2 import Code, Format, Status, TtsParams, TtsResponse
+from .api_pb2_grpc import TtsServicer, add_TtsServicer_to_server
+from .auth import Credentials, Lease, Session
+from .container import wav_header
+
+__all__ = [
+    "FakeLeaseServer",
+    "FakePlayHT",
+    "FakeTtsServicer",
+    "make_lease_token",
+    "serve_fake_tts",
+]
+
+LEASE_EPOCH = datetime(2018, 2, 21, 18, 58)
+LOCAL_TCP = grpc.LocalConnectionType.LOCAL_TCP
+
+
+@log_call(include_result=False)
+def make_lease_token(
+    inference_address: str, duration: int = 3600, created: datetime = None, **meta
+) -> bytes:
+    """Mint a lease token: 64 bytes, created and duration as big-endian u32, JSON meta.
+
+    >>> lease = Lease(make_lease_token('localhost:1'))
+    >>> lease.grpc_addr, lease.is_expired()
+    ('localhost:1', False)
+    """
+    created = int(((created or datetime.now()) - LEASE_EPOCH).total_seconds())
+    meta = json.dumps(meta | {"inference_address": inference_address})
+    return os.urandom(64) + Struct(">2L").pack(created, duration) + meta.encode()
+
+
+@lru_cache(maxsize=32)
+def _tone(audio_format: int, sample_rate: int) -> bytes:
+    """One second of a 440 Hz tone encoded as audio_format."""
+    samples = [
+        0.25 * math.sin(2 * math.pi * 440 * index / sample_rate)
+        for index in range(sample_rate)
+    ]
+    if audio_format == Format.FORMAT_RAW:
+        return array("f", samples).tobytes()
+    if audio_format == Format.FORMAT_WAV:
+        return array("h", (int(sample * 32767) for sample in samples)).tobytes()
+    if audio_format == Format.FORMAT_MULAW:
+        return bytes(sample_rate)
+    return os.urandom(sample_rate // 8)
+
+
+@dataclass
+class FakeTtsServicer(TtsServicer):
+    """Tts service streaming a synthetic tone for each text.
+
+    :param latency: Seconds before the first chunk of each text
+    :param chunk_interval: Seconds between chunks
+    :param chunk_size: Audio bytes per TtsResponse
+    :param seconds_per_character: Length of the audio for each character of text
+    :param error_rate: Probability of failing a request with error_code
+    :param error_code: gRPC status code of injected errors
+    :param stall_rate: Probability of stalling a request for stall_secs before the first chunk
+    :param stall_secs: Length of injected stalls
+    :param leases: Accepted lease tokens (default: accept any non-empty lease)
+    """
+
+    latency: float = field(default=0.05)
+    chunk_interval: float = field(default=0.0)
+    chunk_size: int = field(default=4096)
+    seconds_per_character: float = field(default=0.06)
+    error_rate: float = field(default=0.0)
+    error_code: grpc.StatusCode = field(default=grpc.StatusCode.UNAVAILABLE)
+    stall_rate: float = field(default=0.0)
+    stall_secs: float = field(default=5.0)
+    leases: set[bytes] = field(default=None)
+    requests: int = field(default=0, init=False)
+
+    def audio(self, params: TtsParams, text: str) -> bytes:
+        """Return the synthetic audio for text."""
+        audio_format = params.format if params.HasField("format") else Format.FORMAT_WAV
+        sample_rate = params.sample_rate or 24000
+        tone = _tone(audio_format, sample_rate)
+        seconds = len(text) * self.seconds_per_character
+        audio = tone * int(seconds) + tone[: int(len(tone) * (seconds % 1)) & ~3]
+        if audio_format == Format.FORMAT_WAV:
+            return wav_header(sample_rate) + audio
+        return audio
+
+    def Tts(self, request, context):
+        self.requests += 1
+        if not request.lease or (
+            self.leases is not None and request.lease not in self.leases
+        ):
+            context.abort(grpc.StatusCode.UNAUTHENTICATED, "Invalid lease")
+        if random() < self.error_rate:
+            context.abort(self.error_code, "Injected error")
+        if random() < self.stall_rate:
+            time.sleep(self.stall_secs)
+        request_id, sequence = uuid4().hex, 0
+        texts = request.params.text
+        for index, text in enumerate(texts):
+            time.sleep(self.latency)
+            audio = memoryview(self.audio(request.params, text))
+            final = index == len(texts) - 1
+            last_offset = max(len(audio) - self.chunk_size, 0)
+            for offset in range(0, len(audio), self.chunk_size):
+                if not context.is_active():
+                    return
+                if self.chunk_interval:
+                    time.sleep(self.chunk_interval)
+                last = final and offset >= last_offset
+                yield TtsResponse(
+                    sequence=sequence,
+                    id=request_id,
+                    data=audio[offset : offset + self.chunk_size].tobytes(),
+                    status=Status(
+                        code=Code.CODE_COMPLETE if last else Code.CODE_IN_PROGRESS
+                    ),
+                )
+                sequence += 1
+
+
+def serve_fake_tts(
+    servicer: TtsServicer = None, address: str = "localhost:0", max_workers: int = 64
+) -> tuple[grpc.Server, str]:
+    """Start a local gRPC Tts server (local credentials, see LOCAL_TCP).
+
+    :param servicer: Tts servicer (default: FakeTtsServicer())
+    :param address: Address to bind
+    :param max_workers: Concurrent streams
+    :return: The started server and its target
+    """
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers))
+    add_TtsServicer_to_server(servicer or FakeTtsServicer(), server)
+    port = server.add_secure_port(address, grpc.local_server_credentials(LOCAL_TCP))
+    server.start()
+    return server, f"{address.rpartition(':')[0]}:{port}"
+
+
+class FakeLeaseServer(ThreadingHTTPServer):
+    """Local /api/v2/leases endpoint minting lease tokens for inference_address."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        inference_address: str,
+        duration: int = 3600,
+        latency: float = 0.0,
+        address: tuple[str, int] = ("127.0.0.1", 0),
+    ):
+        super().__init__(address, _LeaseHandler)
+        self.inference_address = inference_address
+        self.duration = duration
+        self.latency = latency
+        self.leases: set[bytes] = set()
+        self.requests = 0
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/api/v2/leases"
+
+    def mint(self) -> bytes:
+        """Mint (and remember) a lease token."""
+        token = make_lease_token(self.inference_address, self.duration)
+        self.leases.add(token)
+        return token
+
+    def start(self) -> "FakeLeaseServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+class _LeaseHandler(BaseHTTPRequestHandler):
+    server: FakeLeaseServer
+
+    def do_POST(self):
+        self.server.requests += 1
+        if not self.headers.get("X-User-Id") or not self.headers.get("Authorization"):
+            self.send_error(401)
+            return
+        time.sleep(self.server.latency)
+        token = self.server.mint()
+        self.send_response(201)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(len(token)))
+        self.end_headers()
+        self.wfile.write(token)
+
+    def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+
+class FakePlayHT:
+    """Fake auth server and Tts server, wired together.
+
+    >>> with FakePlayHT() as fake:  # doctest: +SKIP
+    ...     tts = GrpcTts(fake.session(), channel_credentials=fake.channel_credentials)
+
+    :param servicer: Tts servicer (default: FakeTtsServicer())
+    :param lease_duration: Seconds until minted leases expire
+    :param lease_latency: Seconds the auth server takes to answer
+    """
+
+    def __init__(
+        self,
+        servicer: FakeTtsServicer = None,
+        lease_duration: int = 3600,
+        lease_latency: float = 0.0,
+    ):
+        self.servicer = servicer or FakeTtsServicer()
+        self.server, self.target = serve_fake_tts(self.servicer)
+        self.auth = FakeLeaseServer(self.target, lease_duration, lease_latency).start()
+        if isinstance(self.servicer, FakeTtsServicer):
+            self.servicer.leases = self.auth.leases
+        self.channel_credentials = grpc.local_channel_credentials(LOCAL_TCP)
+
+    def session(self, **kwargs) -> Session:
+        """Create a Session authorizing against the fake auth server."""
+        return Session(Credentials("fake-user", "fake-key"), self.auth.url, **kwargs)
+
+    def close(self):
+        self.server.stop(None)
+        self.auth.shutdown()
+        self.auth.server_close()
+
+    def __enter__(self) -> "FakePlayHT":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
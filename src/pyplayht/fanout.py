@@ -0,0 +1,303 @@
+"""Local format fan-out: synthesize FORMAT_RAW once, encode many variants.
+
+Requires NumPy (``pip install 'pyplayht[audio]'``).
+"""
+
+from .logging_config import log_call, logging
+
+logger = logging.getLogger(__name__)
+
+from dataclasses import dataclass, field
+from math import gcd
+from typing import IO, Iterable, Iterator, Sequence
+
+try:
+    import numpy as np
+except ImportError as error:  # optional dependency
+    raise ImportError(
+        "pyplayht.fanout requires numpy: pip install 'pyplayht[audio]'"
+    ) from error
+
+from .api_pb2 import Format, TtsParams, TtsResponse
+from .container import (
+    WAVE_FORMAT_ALAW,
+    WAVE_FORMAT_IEEE_FLOAT,
+    WAVE_FORMAT_MULAW,
+    WAVE_FORMAT_PCM,
+    WavFormat,
+)
+
+__all__ = [
+    "FanOut",
+    "Resampler",
+    "Variant",
+    "alaw_encode",
+    "mulaw_encode",
+    "ALAW",
+    "FLOAT32",
+    "MULAW",
+    "PCM16",
+]
+
+PCM16 = "pcm16"
+FLOAT32 = "float32"
+MULAW = "mulaw"
+ALAW = "alaw"
+# WAVE format tag and bits per sample of each encoding
+ENCODINGS = {
+    PCM16: (WAVE_FORMAT_PCM, 16),
+    FLOAT32: (WAVE_FORMAT_IEEE_FLOAT, 32),
+    MULAW: (WAVE_FORMAT_MULAW, 8),
+    ALAW: (WAVE_FORMAT_ALAW, 8),
+}
+# FORMAT_RAW audio: little-endian fp32 samples
+RAW_DTYPE = np.dtype("<f4")
+# G.711 segment end points, on the 14-bit (mu-law) and 13-bit (A-law) scales
+_MULAW_SEGMENTS = np.array([0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF, 0x1FFF])
+_ALAW_SEGMENTS = np.array([0x1F, 0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF])
+
+
+def _to_int16(samples: np.ndarray) -> np.ndarray:
+    """Convert float samples in [-1, 1] to int16 (clipping), as int32."""
+    return np.clip(np.rint(samples * 32768), -32768, 32767).astype(np.int32)
+
+
+def mulaw_encode(samples: np.ndarray) -> bytes:
+    """Encode float samples in [-1, 1] as G.711 mu-law.
+
+    >>> mulaw_encode(np.array([0.0, 0.5, -0.5, 1.0, -1.0]))
+    b'\\xff\\x8f\\x0f\\x80\\x00'
+    """
+    pcm = _to_int16(samples) >> 2
+    mask = np.where(pcm < 0, 0x7F, 0xFF)
+    pcm = np.minimum(np.abs(pcm), 8159) + 0x21
+    segment = np.searchsorted(_MULAW_SEGMENTS, pcm)
+    value = np.where(
+        segment >= 8,
+        0x7F,
+        (np.minimum(segment, 7) << 4) | ((pcm >> (segment + 1)) & 0x0F),
+    )
+    return (value ^ mask).astype(np.uint8).tobytes()
+
+
+def alaw_encode(samples: np.ndarray) -> bytes:
+    """Encode float samples in [-1, 1] as G.711 A-law.
+
+    >>> alaw_encode(np.array([0.0, 0.5, -0.5, 1.0, -1.0]))
+    b'\\xd5\\xa5:\\xaa*'
+    """
+    pcm = _to_int16(samples) >> 3
+    negative = pcm < 0
+    mask = np.where(negative, 0x55, 0xD5)
+    pcm = np.where(negative, -pcm - 1, pcm)
+    segment = np.searchsorted(_ALAW_SEGMENTS, pcm)
+    shift = np.maximum(segment, 1)
+    value = np.where(
+        segment >= 8,
+        0x7F,
+        (np.minimum(segment, 7) << 4) | ((pcm >> shift) & 0x0F),
+    )
+    return (value ^ mask).astype(np.uint8).tobytes()
+
+
+class Resampler:
+    """Streaming polyphase resampler with a windowed-sinc low-pass filter.
+
+    Filter history carries over between chunks, so resampling a stream in
+    chunks gives the same samples as resampling it whole.
+
+    >>> resampler = Resampler(24000, 8000)
+    >>> tone = np.sin(np.arange(2400) * 2 * np.pi * 440 / 24000)
+    >>> chunked = np.concatenate([resampler(tone[:1000]), resampler(tone[1000:]), resampler.flush()])
+    >>> whole = Resampler(24000, 8000)
+    >>> len(chunked), bool(np.allclose(chunked, np.concatenate([whole(tone), whole.flush()])))
+    (800, True)
+
+    :param from_rate: Input samples per second
+    :param to_rate: Output samples per second
+    :param zero_crossings: Filter half-length, in zero crossings of the sinc
+    :param rolloff: Cutoff, as a fraction of the lower Nyquist frequency
+    """
+
+    def __init__(
+        self,
+        from_rate: int,
+        to_rate: int,
+        zero_crossings: int = 16,
+        rolloff: float = 0.945,
+    ):
+        divisor = gcd(from_rate, to_rate)
+        self.up, self.down = to_rate // divisor, from_rate // divisor
+        # cutoff in cycles per input sample
+        cutoff = 0.5 * rolloff * min(1.0, self.up / self.down)
+        self.half = int(np.ceil(zero_crossings / (2 * cutoff)))
+        offsets = np.arange(-self.half + 1, self.half + 1)
+        # bank[phase, tap]: weight of input n + offsets[tap] for output time n + phase / up
+        distance = np.arange(self.up)[:, None] / self.up - offsets[None, :]
+        window = np.cos(np.pi * distance / (2 * self.half)) ** 2
+        window[np.abs(distance) >= self.half] = 0
+        self.bank = (2 * cutoff * np.sinc(2 * cutoff * distance) * window).astype(
+            np.float32
+        )
+        self._history = np.zeros(self.half - 1, np.float32)
+        self._start = -(self.half - 1)  # input index of _history[0]
+        self._next = 0  # index of the next output sample
+        self._inputs = 0
+
+    def __call__(self, samples: np.ndarray) -> np.ndarray:
+        """Resample the next chunk of the stream.
+
+        :param samples: Float samples
+        :return: The output samples that chunk completes
+        """
+        if self.up == self.down:
+            return samples
+        self._inputs += len(samples)
+        return self._resample(np.concatenate((self._history, samples)))
+
+    def flush(self) -> np.ndarray:
+        """Return the output samples still held back for the filter's lookahead."""
+        if self.up == self.down:
+            return np.zeros(0, np.float32)
+        remaining = -(-self._inputs * self.up // self.down) - self._next
+        padded = np.concatenate((self._history, np.zeros(self.half, np.float32)))
+        return self._resample(padded)[: max(remaining, 0)]
+
+    def _resample(self, buffer: np.ndarray) -> np.ndarray:
+        """Compute every output whose filter window lies within buffer."""
+        taps = 2 * self.half
+        # outputs are complete up to input index n when n + half is in buffer
+        last_input = self._start + len(buffer) - 1 - self.half
+        stop = -(-(last_input + 1) * self.up // self.down)
+        outputs = np.arange(self._next, max(stop, self._next))
+        positions = outputs * self.down
+        rows = positions // self.up - self._start - self.half + 1
+        if len(outputs):
+            windows = np.lib.stride_tricks.sliding_window_view(buffer, taps)[rows]
+            result = np.einsum(
+                "ij,ij->i", windows, self.bank[positions % self.up], optimize=False
+            )
+            self._next = stop
+        else:
+            result = np.zeros(0, np.float32)
+        keep_from = (self._next * self.down) // self.up - self.half + 1 - self._start
+        self._history = buffer[keep_from:]
+        self._start += keep_from
+        return result.astype(np.float32, copy=False)
+
+
+@dataclass(frozen=True)
+class Variant:
+    """One rendition of the synthesized audio.
+
+    :param sample_rate: Samples per second
+    :param encoding: PCM16, FLOAT32, MULAW or ALAW
+    :param wav: Wrap the samples in a (streaming) RIFF/WAVE header
+    """
+
+    sample_rate: int = field(default=24000)
+    encoding: str = field(default=PCM16)
+    wav: bool = field(default=True)
+
+    def __post_init__(self):
+        if self.encoding not in ENCODINGS:
+            raise ValueError(f"Unknown encoding {self.encoding!r}")
+
+    @property
+    def wav_format(self) -> WavFormat:
+        format_tag, bits_per_sample = ENCODINGS[self.encoding]
+        return WavFormat(format_tag, 1, self.sample_rate, bits_per_sample)
+
+    def encode(self, samples: np.ndarray) -> bytes:
+        """Encode float samples."""
+        if self.encoding == PCM16:
+            return _to_int16(samples).astype("<i2").tobytes()
+        if self.encoding == MULAW:
+            return mulaw_encode(samples)
+        if self.encoding == ALAW:
+            return alaw_encode(samples)
+        return samples.astype(RAW_DTYPE, copy=False).tobytes()
+
+
+class FanOut:
+    """Encode one FORMAT_RAW stream into several Variants, chunk by chunk.
+
+    Request the audio once, at the highest rate any variant needs, with
+    FanOut.params(); each TtsResponse is then converted to every variant
+    locally, so chunks stream out as they arrive.
+
+    >>> fan_out = FanOut(8000, [Variant(8000, MULAW, wav=False), Variant(8000)])
+    >>> [len(data) for data in fan_out.feed(np.zeros(80, '<f4').tobytes())]
+    [80, 204]
+
+    :param source_rate: Sample rate of the FORMAT_RAW audio
+    :param variants: Renditions to produce
+    """
+
+    def __init__(self, source_rate: int, variants: Sequence[Variant]):
+        self.source_rate = source_rate
+        self.variants = tuple(variants)
+        self.resamplers: dict[int, Resampler] = {
+            variant.sample_rate: Resampler(source_rate, variant.sample_rate)
+            for variant in self.variants
+        }
+        self._started = False
+        self._remainder = b""
+
+    @staticmethod
+    def params(variants: Sequence[Variant]) -> TtsParams:
+        """Return the TtsParams overrides requesting audio for all variants."""
+        return TtsParams(
+            format=Format.FORMAT_RAW,
+            sample_rate=max(variant.sample_rate for variant in variants),
+        )
+
+    @log_call(include_args=[], include_result=False)
+    def feed(self, data: bytes) -> list[bytes]:
+        """Convert a chunk of FORMAT_RAW audio.
+
+        :param data: fp32 samples, as received in TtsResponse.data
+        :return: The encoded bytes for each variant, in order
+        """
+        if self._remainder:
+            data = self._remainder + data
+        usable = len(data) - len(data) % RAW_DTYPE.itemsize
+        self._remainder = bytes(data[usable:])
+        samples = np.frombuffer(data, RAW_DTYPE, usable // RAW_DTYPE.itemsize)
+        return self._encode(
+            {rate: resample(samples) for rate, resample in self.resamplers.items()}
+        )
+
+    def finish(self) -> list[bytes]:
+        """Return the last encoded bytes of each variant, at the end of the stream."""
+        if self._remainder:
+            logger.warning("Dropping %d trailing bytes", len(self._remainder))
+            self._remainder = b""
+        return self._encode(
+            {rate: resample.flush() for rate, resample in self.resamplers.items()}
+        )
+
+    def _encode(self, resampled: dict[int, np.ndarray]) -> list[bytes]:
+        """Encode the resampled samples of each variant, headers first."""
+        encoded = [
+            variant.encode(resampled[variant.sample_rate]) for variant in self.variants
+        ]
+        if not self._started:
+            self._started = True
+            encoded = [
+                variant.wav_format.header() + data if variant.wav else data
+                for variant, data in zip(self.variants, encoded)
+            ]
+        return encoded
+
+    def stream(self, responses: Iterable[TtsResponse]) -> Iterator[list[bytes]]:
+        """Convert a TtsResponse stream, yielding the encoded bytes of each variant."""
+        for tts_response in responses:
+            yield self.feed(tts_response.data)
+        yield self.finish()
+
+    def write(self, responses: Iterable[TtsResponse], outputs: Sequence[IO[bytes]]):
+        """Convert a TtsResponse stream, writing each variant to its output."""
+        for encoded in self.stream(responses):
+            for output, data in zip(outputs, encoded):
+                output.write(data)
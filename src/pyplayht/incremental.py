@@ -0,0 +1,169 @@
+"""Incremental TTS: speak text while it is still being written"""
+
+from .logging_config import log_call, logging
+
+logger = logging.getLogger(__name__)
+
+import asyncio
+import threading
+from collections import deque
+from queue import Empty, SimpleQueue
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator
+
+from .streaming import BufferedStream
+from .text import asegment_stream, segment_stream
+from .tts import AsyncGrpcTts, GrpcTts, TtsResponse
+
+__all__ = ["asynthesize_incremental", "synthesize_incremental"]
+
+_END = object()
+
+
+def _segment_to(fragments: Iterable[str], segments: SimpleQueue, **kwargs):
+    """Put the segments of fragments into segments, then _END (or the raised exception)."""
+    try:
+        for segment in segment_stream(fragments, **kwargs):
+            segments.put(segment)
+    except Exception as error:
+        segments.put(error)
+    else:
+        segments.put(_END)
+
+
+@log_call(include_args=["concurrency", "max_wait"], include_result=False)
+def synthesize_incremental(
+    tts: GrpcTts,
+    fragments: Iterable[str],
+    concurrency: int = 2,
+    max_wait: float = None,
+    **limits: int,
+) -> Iterator[TtsResponse]:
+    """Synthesize text fragments sentence by sentence, as they arrive.
+
+    Fragments are segmented in a background thread (see segment_stream);
+    each segment starts its own Tts stream as soon as it is cut, with up to
+    concurrency streams reading ahead, and their audio is yielded in order.
+    The first audio so follows the end of the first sentence, not the end
+    of the text.
+
+    :param tts: GrpcTts client instance
+    :param fragments: Text fragments, for example tokens from a language model
+    :param concurrency: Segments synthesized ahead of the one being yielded
+    :param max_wait: Seconds text may wait for its sentence to end
+    :param **limits: sentence_threshold and word_threshold of the Segmenter
+    :yield: TtsResponse objects, in text order
+    """
+    segments = SimpleQueue()
+    threading.Thread(
+        target=_segment_to,
+        args=(fragments, segments),
+        kwargs={"max_wait": max_wait, **limits},
+        name="pyplayht-segmenter",
+        daemon=True,
+    ).start()
+    window: deque[BufferedStream] = deque()
+    ended = False
+
+    def admit(block: bool):
+        """Start streams for the segments already cut (waiting only when idle)."""
+        nonlocal ended
+        while not ended and len(window) < concurrency:
+            try:
+                segment = segments.get(block=block and not window)
+            except Empty:
+                return
+            if segment is _END:
+                ended = True
+            elif isinstance(segment, Exception):
+                raise segment
+            else:
+                window.append(tts.stream([segment]))
+
+    try:
+        while True:
+            admit(block=True)
+            if not window:
+                return
+            for tts_response in window[0]:
+                yield tts_response
+                admit(block=False)
+            window.popleft()
+    finally:
+        for stream in window:
+            stream.close()
+
+
+async def _prefetch(tts: AsyncGrpcTts, segment: str, responses: asyncio.Queue):
+    """Put the TtsResponses of segment into responses, then _END (or the raised exception)."""
+    try:
+        async for tts_response in tts([segment]):
+            await responses.put(tts_response)
+    except Exception as error:
+        await responses.put(error)
+    else:
+        await responses.put(_END)
+
+
+@log_call(include_args=["concurrency", "max_wait"], include_result=False)
+async def asynthesize_incremental(
+    tts: AsyncGrpcTts,
+    fragments: AsyncIterable[str],
+    concurrency: int = 2,
+    max_wait: float = None,
+    max_chunks: int = 256,
+    **limits: int,
+) -> AsyncIterator[TtsResponse]:
+    """Synthesize async text fragments sentence by sentence, as they arrive.
+
+    The asyncio counterpart of synthesize_incremental.
+
+    :param tts: AsyncGrpcTts client instance
+    :param fragments: Async iterable of text fragments
+    :param concurrency: Segments synthesized ahead of the one being yielded
+    :param max_wait: Seconds text may wait for its sentence to end
+    :param max_chunks: Chunks read ahead per segment
+    :param **limits: sentence_threshold and word_threshold of the Segmenter
+    :yield: TtsResponse objects, in text order
+    """
+    segments = asegment_stream(fragments, max_wait, **limits)
+    window: deque[tuple[asyncio.Task, asyncio.Queue]] = deque()
+    next_segment: asyncio.Task = None
+    ended = False
+
+    async def admit(block: bool):
+        """Start streams for the segments already cut (waiting only when idle)."""
+        nonlocal ended, next_segment
+        while not ended and len(window) < concurrency:
+            if next_segment is None:
+                next_segment = asyncio.ensure_future(anext(segments, _END))
+            if not next_segment.done():
+                if not block or window:
+                    return
+                await next_segment
+            segment, next_segment = next_segment.result(), None
+            if segment is _END:
+                ended = True
+                continue
+            responses = asyncio.Queue(max_chunks)
+            task = asyncio.create_task(_prefetch(tts, segment, responses))
+            window.append((task, responses))
+
+    try:
+        while True:
+            await admit(block=True)
+            if not window:
+                return
+            _, responses = window[0]
+            while (tts_response := await responses.get()) is not _END:
+                if isinstance(tts_response, Exception):
+                    raise tts_response
+                yield tts_response
+                await admit(block=False)
+            window.popleft()
+    finally:
+        if next_segment is not None:
+            next_segment.cancel()
+            await asyncio.gather(next_segment, return_exceptions=True)
+        for task, _ in window:
+            task.cancel()
+        await segments.aclose()
@@ -1,11 +1,88 @@
-from sys import stderr
+"""Logging, and eliot tracing that costs nothing when it is off.
+
+Tracing is chosen when the package is imported, from the environment:
+
+* ``PYPLAYHT_TRACE`` unset or ``0``: log_call leaves functions undecorated.
+* ``PYPLAYHT_TRACE=1``: every decorated call is traced.
+* ``PYPLAYHT_TRACE=0.01``: about 1% of decorated calls are traced.
+* ``PYPLAYHT_TRACE_FILE``: trace destination (default: stderr).
+"""
 
-from eliot import log_call, to_file
+import os
+from functools import partial, wraps
+from random import random
+from sys import stderr
+from typing import IO, Callable
 
-to_file(stderr)
 import picologging as logging
-from eliot.stdlib import EliotHandler
 
-logging.getLogger().addHandler(EliotHandler())
+__all__ = ["logging", "log_call", "enable_tracing", "set_sample_rate"]
+
+
+def _parse_sample_rate(value: str | None) -> float:
+    """Parse a PYPLAYHT_TRACE value into a sample rate between 0 and 1.
+
+    >>> [_parse_sample_rate(value) for value in (None, '', '0', '1', '0.25', 'yes', '7')]
+    [0.0, 0.0, 0.0, 1.0, 0.25, 1.0, 1.0]
+    """
+    if not value:
+        return 0.0
+    try:
+        return min(max(float(value), 0.0), 1.0)
+    except ValueError:
+        return 1.0
+
+
+_sample_rate = _parse_sample_rate(os.environ.get("PYPLAYHT_TRACE"))
+TRACING = _sample_rate > 0
+
+
+def set_sample_rate(sample_rate: float):
+    """Change the fraction of traced calls, from 0 (none) to 1 (all).
+
+    Only works if tracing was on at import (PYPLAYHT_TRACE above 0): with
+    tracing off, log_call left functions undecorated and a later call
+    cannot turn tracing on.
+    """
+    global _sample_rate
+    _sample_rate = min(max(sample_rate, 0.0), 1.0)
+
+
+def log_call(wrapped_function: Callable = None, **kwargs) -> Callable:
+    """Trace calls with eliot.log_call, or return wrapped_function unchanged
+    when tracing is off. With tracing on, each call is traced with the
+    current sample rate (see set_sample_rate); the others go straight to
+    wrapped_function.
+
+    :param wrapped_function: Function to decorate
+    :param **kwargs: eliot.log_call keyword arguments
+    """
+    if wrapped_function is None:
+        return partial(log_call, **kwargs)
+    if not TRACING:
+        return wrapped_function
+    from eliot import log_call as eliot_log_call
+
+    traced = eliot_log_call(wrapped_function, **kwargs)
+
+    @wraps(wrapped_function)
+    def sampled(*args, **kwargs):
+        if _sample_rate >= 1 or random() < _sample_rate:
+            return traced(*args, **kwargs)
+        return wrapped_function(*args, **kwargs)
+
+    return sampled
+
+
+def enable_tracing(destination: IO = stderr):
+    """Write eliot traces (and standard log records) to destination."""
+    from eliot import to_file
+    from eliot.stdlib import EliotHandler
+
+    to_file(destination)
+    logging.getLogger().addHandler(EliotHandler())
+
 
-__all__ = ["logging", "log_call"]
+if TRACING:
+    trace_file = os.environ.get("PYPLAYHT_TRACE_FILE")
+    enable_tracing(open(trace_file, "a") if trace_file else stderr)
@@ -0,0 +1,252 @@
+"""Latency and throughput metrics (counters and histograms)"""
+
+import threading
+from bisect import bisect_left
+from time import perf_counter
+from typing import Iterable, Iterator, Sequence
+
+__all__ = [
+    "Counter",
+    "Histogram",
+    "Metrics",
+    "StreamTimer",
+    "METRICS",
+    "exponential_buckets",
+]
+
+
+def exponential_buckets(start: float, factor: float, count: int) -> tuple[float, ...]:
+    """Return count histogram bucket upper bounds, from start growing by factor.
+
+    >>> exponential_buckets(0.5, 2, 4)
+    (0.5, 1.0, 2.0, 4.0)
+    """
+    return tuple(start * factor**index for index in range(count))
+
+
+LATENCY_BUCKETS = exponential_buckets(0.001, 2, 17)  # 1ms .. ~65s
+COUNT_BUCKETS = exponential_buckets(1, 2, 13)  # 1 .. 4096
+RATE_BUCKETS = exponential_buckets(1024, 2, 14)  # 1KiB/s .. 8MiB/s
+SEQUENCE_BUCKETS = (0,) + COUNT_BUCKETS  # 0, 1 .. 4096
+
+
+class Counter:
+    """Monotonic counter."""
+
+    def __init__(self, name: str, help: str = ""):
+        self.name = name
+        self.help = help
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+    def snapshot(self) -> float:
+        return self.value
+
+    def exposition(self) -> Iterator[str]:
+        """Yield Prometheus text exposition lines."""
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        yield f"{self.name} {self.value}"
+
+
+class Histogram:
+    """Fixed-bucket histogram, with quantiles estimated from the buckets.
+
+    >>> histogram = Histogram('h', bounds=(1, 2, 4))
+    >>> for value in (0.5, 1.5, 1.5, 3, 10):
+    ...     histogram.observe(value)
+    >>> histogram.count, histogram.sum, histogram.counts
+    (5, 16.5, [1, 2, 1, 1])
+    >>> histogram.quantile(0.5)
+    1.75
+    """
+
+    def __init__(
+        self, name: str, help: str = "", bounds: Sequence[float] = LATENCY_BUCKETS
+    ):
+        self.name = name
+        self.help = help
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    def quantile(self, q: float) -> float | None:
+        """Estimate the q-quantile by interpolating within its bucket."""
+        with self._lock:
+            counts, count = list(self.counts), self.count
+        if not count:
+            return None
+        rank, seen = q * count, 0
+        for index, bucket_count in enumerate(counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self.bounds[index - 1] if index else 0.0
+                upper = self.bounds[min(index, len(self.bounds) - 1)]
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.bounds[-1]
+
+    def snapshot(self) -> dict[str, float | None]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+        }
+
+    def exposition(self) -> Iterator[str]:
+        """Yield Prometheus text exposition lines."""
+        with self._lock:
+            counts, count, total = list(self.counts), self.count, self.sum
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        cumulative = 0
+        for bound, bucket_count in zip(self.bounds, counts):
+            cumulative += bucket_count
+            yield f'{self.name}_bucket{{le="{bound:g}"}} {cumulative}'
+        yield f'{self.name}_bucket{{le="+Inf"}} {count}'
+        yield f"{self.name}_sum {total}"
+        yield f"{self.name}_count {count}"
+
+
+class Metrics:
+    """Registry of named Counters and Histograms."""
+
+    def __init__(self):
+        self._metrics: dict[str, Counter | Histogram] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help: str = "") -> Counter:
+        """Return the Counter called name, creating it if needed."""
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.setdefault(name, Counter(name, help))
+        return metric
+
+    def histogram(
+        self, name: str, help: str = "", bounds: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        """Return the Histogram called name, creating it if needed."""
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.setdefault(name, Histogram(name, help, bounds))
+        return metric
+
+    def snapshot(self) -> dict[str, float | dict[str, float | None]]:
+        """Return the current value of every metric."""
+        return {name: metric.snapshot() for name, metric in list(self._metrics.items())}
+
+    def to_prometheus(self) -> str:
+        """Return every metric in the Prometheus text exposition format."""
+        return "".join(
+            f"{line}\n"
+            for metric in list(self._metrics.values())
+            for line in metric.exposition()
+        )
+
+    def stream_timer(self) -> "StreamTimer":
+        """Start timing a TtsResponse stream."""
+        return StreamTimer(self)
+
+    def measure_stream(self, responses: Iterable) -> Iterator:
+        """Record time to first chunk, duration, chunks (by sequence) and bytes of a TtsResponse stream."""
+        timer = StreamTimer(self)
+        try:
+            for tts_response in responses:
+                timer.chunk(tts_response)
+                yield tts_response
+        except Exception:
+            timer.failed()
+            raise
+        finally:
+            timer.finish()
+
+
+class StreamTimer:
+    """Time to first chunk, duration, chunks and bytes of one TtsResponse stream.
+
+    Each chunk is also counted by its TtsResponse.sequence, in the
+    ``pyplayht_tts_chunk_sequence`` histogram: how many chunks arrive at
+    each point of a stream (0 is the first chunk).
+
+    >>> from types import SimpleNamespace
+    >>> metrics = Metrics()
+    >>> timer = metrics.stream_timer()
+    >>> for sequence in (0, 1, 2, 3):
+    ...     timer.chunk(SimpleNamespace(sequence=sequence, data=b'ab'))
+    >>> timer.finish()
+    >>> metrics.histogram('pyplayht_tts_chunk_sequence').counts[:4]
+    [1, 1, 1, 1]
+    >>> metrics.snapshot()['pyplayht_tts_chunks_total']
+    4
+    """
+
+    __slots__ = ("metrics", "start", "chunks", "size")
+
+    def __init__(self, metrics: Metrics):
+        self.metrics = metrics
+        self.start = perf_counter()
+        self.chunks = 0
+        self.size = 0
+
+    def chunk(self, tts_response):
+        """Record a received TtsResponse."""
+        if not self.chunks:
+            self.metrics.histogram(
+                "pyplayht_tts_first_chunk_seconds",
+                "Time from request to first TtsResponse",
+            ).observe(perf_counter() - self.start)
+        self.metrics.histogram(
+            "pyplayht_tts_chunk_sequence",
+            "TtsResponse chunks by sequence number",
+            SEQUENCE_BUCKETS,
+        ).observe(tts_response.sequence)
+        self.chunks += 1
+        self.size += len(tts_response.data)
+
+    def failed(self):
+        """Record a failed stream."""
+        self.metrics.counter(
+            "pyplayht_tts_stream_errors_total", "Tts streams that failed"
+        ).inc()
+
+    def finish(self):
+        """Record the end (or abandonment) of the stream."""
+        metrics, elapsed = self.metrics, perf_counter() - self.start
+        metrics.counter("pyplayht_tts_streams_total", "Tts streams").inc()
+        metrics.counter("pyplayht_tts_chunks_total", "TtsResponse chunks").inc(
+            self.chunks
+        )
+        metrics.counter("pyplayht_tts_bytes_total", "Audio bytes received").inc(
+            self.size
+        )
+        metrics.histogram("pyplayht_tts_stream_seconds", "Tts stream duration").observe(
+            elapsed
+        )
+        metrics.histogram(
+            "pyplayht_tts_stream_chunks", "TtsResponse chunks per stream", COUNT_BUCKETS
+        ).observe(self.chunks)
+        if elapsed > 0 and self.size:
+            metrics.histogram(
+                "pyplayht_tts_bytes_per_second",
+                "Audio bytes per second of stream duration",
+                RATE_BUCKETS,
+            ).observe(self.size / elapsed)
+
+
+METRICS = Metrics()
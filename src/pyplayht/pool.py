@@ -0,0 +1,238 @@
+"""Multi-account client: spread TTS calls across several PlayHT accounts"""
+
+from .logging_config import log_call, logging
+
+logger = logging.getLogger(__name__)
+
+import threading
+from dataclasses import dataclass, field, replace
+from random import random
+from time import monotonic
+from typing import Iterator, Sequence
+
+from grpc import RpcError, StatusCode
+
+from .auth import Credentials, LeaseStore, Session
+from .metrics import METRICS, Metrics
+from .retry import RetryPolicy
+from .streaming import BufferedStream
+from .tts import GrpcTts, StreamControl, TtsParams, TtsResponse, TtsStream
+
+__all__ = ["Account", "SessionPool"]
+
+RATE_LIMIT_CODES = frozenset((StatusCode.RESOURCE_EXHAUSTED,))
+
+
+@dataclass(eq=False)
+class Account:
+    """One PlayHT account: its Session, its GrpcTts client and its load.
+
+    :param tts: GrpcTts client of the account (with its own Session and channels)
+    :param capacity: Streams the account may serve at once
+    """
+
+    tts: GrpcTts
+    capacity: int = field(default=4)
+    in_flight: int = field(default=0)
+    failures: int = field(default=0)
+    backoff_until: float = field(default=0.0)
+
+    @property
+    def user_id(self) -> str:
+        return self.tts.session.user_id
+
+    @property
+    def spare(self) -> int:
+        """Return how many more streams the account may serve."""
+        return self.capacity - self.in_flight
+
+
+class SessionPool:
+    """GrpcTts-compatible client routing each call to one of several accounts.
+
+    Calls go to the available account with the most spare capacity. An
+    account answering with a rate limit (RESOURCE_EXHAUSTED) backs off
+    exponentially, and the call moves to another account.
+
+    :param accounts: Accounts to spread calls across (with the same TtsParams)
+    :param backoff: Seconds of the first back-off of a rate-limited account
+    :param max_backoff: Longest back-off, in seconds
+    """
+
+    metrics: Metrics = METRICS
+
+    def __init__(
+        self,
+        accounts: Sequence[Account],
+        backoff: float = 1.0,
+        max_backoff: float = 60.0,
+    ):
+        if not accounts:
+            raise ValueError("SessionPool needs at least one account")
+        if any(
+            account.tts.tts_params != accounts[0].tts.tts_params for account in accounts
+        ):
+            raise ValueError("SessionPool accounts must share their TtsParams")
+        self.accounts = list(accounts)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._lock = threading.Lock()
+
+    @property
+    def tts_params(self) -> TtsParams:
+        """Return the TtsParams shared by the accounts."""
+        return self.accounts[0].tts.tts_params
+
+    @classmethod
+    @log_call(include_args=["env_prefixes", "capacity"], include_result=False)
+    def default(
+        cls,
+        *params: TtsParams,
+        env_prefixes: Sequence[str] = ("PLAY_HT_",),
+        capacity: int = 4,
+        store: LeaseStore = None,
+        retry: RetryPolicy = None,
+        **kwargs,
+    ) -> "SessionPool":
+        """Create a pool with one account per environment prefix.
+
+        >>> SessionPool.default(env_prefixes=('PLAY_HT_', 'PLAY_HT_2_'))  # doctest: +SKIP
+
+        :param *params: List of TtsParams objects (later overrides earlier)
+        :param env_prefixes: Prefixes of each account's USER_ID and API_KEY variables
+        :param capacity: Streams each account may serve at once
+        :param store: LeaseStore to share leases with other processes
+        :param retry: RetryPolicy of each account (rate limits move calls instead)
+        :param **kwargs: Other GrpcTts keyword arguments
+        """
+        # one seed and voice for every account, so they all sound the same
+        params = GrpcTts.default_params(*params)
+        retry = RetryPolicy() if retry is None else retry
+        retry = replace(retry, retryable_codes=retry.retryable_codes - RATE_LIMIT_CODES)
+        accounts = [
+            Account(
+                GrpcTts(
+                    Session.default(
+                        credentials=Credentials.default(env_prefix=env_prefix),
+                        store=store,
+                    ),
+                    params,
+                    retry=retry,
+                    **kwargs,
+                ),
+                capacity,
+            )
+            for env_prefix in env_prefixes
+        ]
+        return cls(accounts)
+
+    def _acquire(self, exclude: set[Account], control: StreamControl) -> Account | None:
+        """Reserve the account with the most spare capacity, waiting out back-offs.
+
+        :return: The reserved account, or None once cancelled
+        """
+        while not control.cancelled:
+            with self._lock:
+                now = monotonic()
+                candidates = [
+                    account for account in self.accounts if account not in exclude
+                ] or self.accounts
+                ready = [
+                    account for account in candidates if account.backoff_until <= now
+                ]
+                if ready:
+                    account = max(ready, key=lambda account: account.spare)
+                    account.in_flight += 1
+                    return account
+                wait = min(account.backoff_until for account in candidates) - now
+            logger.warning("All accounts rate limited, waiting %.1fs", wait)
+            control.wait(wait)
+        return None
+
+    def _release(self, account: Account, rate_limited: bool = False):
+        """Return a reserved account, backing it off if it was rate limited."""
+        with self._lock:
+            account.in_flight -= 1
+            if not rate_limited:
+                account.failures = 0
+                return
+            if account.backoff_until > monotonic():
+                return  # concurrent calls hit the same limit
+            delay = min(self.max_backoff, self.backoff * 2**account.failures)
+            account.failures += 1
+            account.backoff_until = monotonic() + delay * (0.5 + random() / 2)
+        logger.warning("Account %s rate limited, backing off", account.user_id)
+        self.metrics.counter(
+            "pyplayht_pool_backoffs_total", "Rate-limited account back-offs"
+        ).inc()
+
+    @log_call(include_result=False)
+    def __call__(self, texts: list[str], timeout: float = None) -> TtsStream:
+        """Convert list of text strings to an audio byte stream, on one of the accounts.
+
+        :param texts: string to process
+        :param timeout: Seconds to finish the synthesis, moves included
+        :return: TtsStream of TtsResponse objects
+        """
+        stream = TtsStream(timeout)
+        stream.responses = self._responses(texts, stream.control)
+        return stream
+
+    @log_call(include_args=["max_bytes", "max_chunks"], include_result=False)
+    def stream(
+        self,
+        texts: list[str],
+        timeout: float = None,
+        max_bytes: int = 2**20,
+        max_chunks: int = 256,
+    ) -> BufferedStream:
+        """Convert list of text strings to audio, read ahead into a bounded queue.
+
+        See GrpcTts.stream.
+        """
+        return BufferedStream(self(texts, timeout), max_bytes, max_chunks, self.metrics)
+
+    def _responses(
+        self, texts: list[str], control: StreamControl
+    ) -> Iterator[TtsResponse]:
+        """Yield the TtsResponses for texts, moving to another account when rate limited.
+
+        A call is only moved before its first chunk, and to each account once.
+        """
+        tried: set[Account] = set()
+        while True:
+            account = self._acquire(tried, control)
+            if account is None:
+                return
+            tried.add(account)
+            started = rate_limited = False
+            try:
+                responses = control.track(account.tts(texts, control.remaining()))
+                with responses:
+                    for tts_response in responses:
+                        started = True
+                        yield tts_response
+                return
+            except RpcError as error:
+                rate_limited = error.code() in RATE_LIMIT_CODES
+                if not rate_limited or started or len(tried) == len(self.accounts):
+                    raise
+            finally:
+                self._release(account, rate_limited)
+
+    def warm(self, timeout: float = None):
+        """Connect every account's channels now."""
+        for account in self.accounts:
+            account.tts.warm(timeout)
+
+    def close(self):
+        """Close every account's client and session."""
+        for account in self.accounts:
+            account.tts.close()
+            account.tts.session.close()
+
+    def __enter__(self) -> "SessionPool":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,77 @@
+"""Local Tts proxy: one shared Session and warm channels for every local client"""
+
+from .logging_config import log_call, logging
+
+logger = logging.getLogger(__name__)
+
+from concurrent import futures
+from typing import Iterator
+
+import grpc
+
+from .api_pb2_grpc import TtsServicer, add_TtsServicer_to_server
+from .tts import GrpcTts, TtsResponse
+
+__all__ = ["TtsProxy", "serve"]
+
+# deadlines further out than this are treated as no deadline
+MAX_TIMEOUT = 24 * 3600
+
+
+class TtsProxy(TtsServicer):
+    """Tts service forwarding each request upstream through a shared GrpcTts.
+
+    The client's lease is ignored and replaced with the GrpcTts session's;
+    the client's params (texts included) are sent as they are, and the
+    upstream TtsResponses are streamed back unchanged. Upstream errors are
+    returned with their status code; a client cancelling its call (or
+    reaching its deadline) cancels the upstream call.
+
+    :param tts: GrpcTts client instance (its retry policy and cache apply)
+    """
+
+    def __init__(self, tts: GrpcTts):
+        self.tts = tts
+
+    def Tts(self, request, context) -> Iterator[TtsResponse]:
+        timeout = context.time_remaining()
+        if timeout is not None and timeout > MAX_TIMEOUT:
+            timeout = None
+        stream = self.tts.forward(request.params, timeout)
+        context.add_callback(stream.cancel)
+        try:
+            yield from stream
+        except grpc.RpcError as error:
+            context.abort(error.code(), error.details() or "Upstream error")
+        finally:
+            stream.close()
+
+
+@log_call(include_args=["address", "max_streams"], include_result=False)
+def serve(
+    tts: GrpcTts, address: str = "localhost:50051", max_streams: int = 64
+) -> tuple[grpc.Server, str]:
+    """Start a TtsProxy on a local port or unix socket (local credentials).
+
+    Clients connect with ``grpc.local_channel_credentials()`` (LOCAL_TCP
+    for a port, UDS for ``unix:`` addresses) and any (or no) lease.
+
+    :param tts: GrpcTts client instance the proxy forwards through
+    :param address: Address to bind, "host:port" or "unix:path"
+    :param max_streams: Concurrent client streams
+    :return: The started server and its target
+    """
+    connection = (
+        grpc.LocalConnectionType.UDS
+        if address.startswith("unix:")
+        else grpc.LocalConnectionType.LOCAL_TCP
+    )
+    server = grpc.server(
+        futures.ThreadPoolExecutor(max_streams, thread_name_prefix="pyplayht-proxy")
+    )
+    add_TtsServicer_to_server(TtsProxy(tts), server)
+    port = server.add_secure_port(address, grpc.local_server_credentials(connection))
+    server.start()
+    if connection == grpc.LocalConnectionType.UDS:
+        return server, address
+    return server, f"{address.rpartition(':')[0]}:{port}"
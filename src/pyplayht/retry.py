@@ -0,0 +1,105 @@
+"""Retry and hedging policy for Tts streams"""
+
+import json
+from dataclasses import dataclass, field
+from random import random
+
+from grpc import StatusCode
+
+__all__ = ["RetryPolicy", "NO_RETRY"]
+
+TTS_SERVICE = "playht.v1.Tts"
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """When and how often to retry (and hedge) a Tts stream.
+
+    A stream failing with one of retryable_codes is retried after an
+    exponential backoff with jitter; one failing with one of auth_codes is
+    retried at once with a refreshed lease. A stream that already yielded
+    chunks is only retried with a fixed seed (so the audio lines up), and
+    chunks already yielded are skipped.
+
+    With hedge_after, a stream that sends no chunk within hedge_after seconds
+    gets a second (hedged) request; whichever answers first is kept and the
+    others are cancelled.
+
+    >>> policy = RetryPolicy(initial_backoff=1, max_backoff=3, jitter=0)
+    >>> [policy.backoff(attempt) for attempt in (1, 2, 3)]
+    [1.0, 2.0, 3.0]
+
+    :param max_attempts: Calls per stream, including the first
+    :param initial_backoff: Seconds before the first retry
+    :param max_backoff: Upper bound of the backoff, in seconds
+    :param backoff_multiplier: Backoff growth per attempt
+    :param jitter: Random fraction taken off each backoff (1: full jitter)
+    :param retryable_codes: Status codes retried after a backoff
+    :param auth_codes: Status codes retried with a refreshed lease
+    :param hedge_after: Seconds without a first chunk before hedging (default: never)
+    :param max_hedges: Hedged calls per attempt
+    :param service_config: Also let gRPC retry transparently, via a service config
+    """
+
+    max_attempts: int = field(default=3)
+    initial_backoff: float = field(default=0.1)
+    max_backoff: float = field(default=5.0)
+    backoff_multiplier: float = field(default=2.0)
+    jitter: float = field(default=1.0)
+    retryable_codes: frozenset[StatusCode] = field(
+        default=frozenset((StatusCode.UNAVAILABLE, StatusCode.RESOURCE_EXHAUSTED))
+    )
+    auth_codes: frozenset[StatusCode] = field(
+        default=frozenset((StatusCode.UNAUTHENTICATED,))
+    )
+    hedge_after: float = field(default=None)
+    max_hedges: int = field(default=1)
+    service_config: bool = field(default=False)
+
+    def backoff(self, attempt: int) -> float:
+        """Return the seconds to wait before retry number attempt (from 1)."""
+        ceiling = min(
+            self.max_backoff,
+            self.initial_backoff * self.backoff_multiplier ** (attempt - 1),
+        )
+        return ceiling * (1 - self.jitter * random())
+
+    def service_config_json(self) -> str:
+        """Return a gRPC service config with this policy as the Tts retryPolicy.
+
+        gRPC allows 2 to 5 attempts, and retries a stream only until its
+        first response arrives.
+
+        >>> json.loads(RetryPolicy().service_config_json())['methodConfig'][0]['retryPolicy']['maxAttempts']
+        3
+        """
+        return json.dumps(
+            {
+                "methodConfig": [
+                    {
+                        "name": [{"service": TTS_SERVICE, "method": "Tts"}],
+                        "retryPolicy": {
+                            "maxAttempts": min(max(self.max_attempts, 2), 5),
+                            "initialBackoff": f"{self.initial_backoff}s",
+                            "maxBackoff": f"{self.max_backoff}s",
+                            "backoffMultiplier": self.backoff_multiplier,
+                            "retryableStatusCodes": sorted(
+                                code.name for code in self.retryable_codes
+                            ),
+                        },
+                    }
+                ]
+            }
+        )
+
+    def channel_options(self) -> tuple[tuple[str, int | str], ...]:
+        """Return the gRPC ChannelOptions enabling the service config retries."""
+        if not self.service_config:
+            return ()
+        return (
+            ("grpc.enable_retries", 1),
+            ("grpc.service_config", self.service_config_json()),
+        )
+
+
+NO_RETRY = RetryPolicy(max_attempts=1)
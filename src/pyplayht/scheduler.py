@@ -0,0 +1,229 @@
+"""Client-side admission control: rate limit, stream cap and priorities"""
+
+from .logging_config import log_call, logging
+
+logger = logging.getLogger(__name__)
+
+import threading
+from collections import deque
+from time import monotonic, perf_counter
+from typing import Iterator
+
+from .metrics import METRICS, Metrics
+from .streaming import BufferedStream
+from .tts import GrpcTts, StreamControl, TtsResponse, TtsStream
+
+__all__ = ["Scheduler", "TokenBucket", "BATCH", "INTERACTIVE"]
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+PRIORITIES = (INTERACTIVE, BATCH)  # highest first
+
+
+class TokenBucket:
+    """Token bucket rate limit: rate tokens per second, up to burst saved.
+
+    >>> bucket = TokenBucket(rate=10, burst=2)
+    >>> bucket.take(), bucket.take(), bucket.delay() > 0
+    (True, True, True)
+
+    :param rate: Tokens added per second
+    :param burst: Most tokens saved up (default: one second's worth)
+    """
+
+    def __init__(self, rate: float, burst: float = None):
+        self.rate = rate
+        self.burst = max(1.0, rate if burst is None else burst)
+        self.tokens = self.burst
+        self._updated = monotonic()
+
+    def _refill(self):
+        now = monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay(self) -> float:
+        """Return the seconds until a token is available."""
+        self._refill()
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+    def take(self) -> bool:
+        """Take a token if one is available."""
+        self._refill()
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class _Wakeup:
+    """Stand-in call waking the waiting calls when a queued stream is cancelled."""
+
+    def __init__(self, changed: threading.Condition):
+        self.changed = changed
+
+    def cancel(self):
+        with self.changed:
+            self.changed.notify_all()
+
+
+class Scheduler:
+    """Admission control in front of a shared GrpcTts (or SessionPool).
+
+    Streams start at most rate per second (token bucket) with at most
+    max_in_flight open at once. Waiting INTERACTIVE calls always start
+    before waiting BATCH calls, and BATCH calls never take the last
+    interactive_reserve slots, so bulk work soaks up spare capacity without
+    delaying the first byte of interactive calls. Calls of one priority
+    start in arrival order.
+
+    The time each call waits is recorded in the
+    ``pyplayht_scheduler_<priority>_wait_seconds`` histograms.
+
+    :param tts: GrpcTts client instance
+    :param max_in_flight: Most streams open at once
+    :param rate: Most streams started per second (default: no limit)
+    :param burst: Streams that may start at once after an idle period
+    :param interactive_reserve: Slots BATCH calls leave free
+    :param metrics: Metrics registry for the queue waits
+    """
+
+    def __init__(
+        self,
+        tts: GrpcTts,
+        max_in_flight: int = 8,
+        rate: float = None,
+        burst: float = None,
+        interactive_reserve: int = 1,
+        metrics: Metrics = METRICS,
+    ):
+        if not 0 <= interactive_reserve < max_in_flight:
+            raise ValueError("interactive_reserve must be less than max_in_flight")
+        self.tts = tts
+        self.max_in_flight = max_in_flight
+        self.bucket = None if rate is None else TokenBucket(rate, burst)
+        self.interactive_reserve = interactive_reserve
+        self.metrics = metrics
+        self.in_flight = 0
+        self._queues: dict[str, deque] = {priority: deque() for priority in PRIORITIES}
+        self._changed = threading.Condition()
+
+    @property
+    def queued(self) -> dict[str, int]:
+        """Return the number of waiting calls of each priority."""
+        return {priority: len(queue) for priority, queue in self._queues.items()}
+
+    def _limit(self, priority: str) -> int:
+        if priority == INTERACTIVE:
+            return self.max_in_flight
+        return self.max_in_flight - self.interactive_reserve
+
+    def _may_start(self, priority: str, ticket: object) -> bool:
+        """Check if ticket heads the highest waiting priority, with a free slot (hold the lock)."""
+        if self.in_flight >= self._limit(priority):
+            return False
+        for each in PRIORITIES:
+            if self._queues[each]:
+                return each == priority and self._queues[each][0] is ticket
+        return False
+
+    def _admit(self, priority: str, control: StreamControl) -> bool:
+        """Wait for a slot (and a token) for a call, in priority order.
+
+        :return: True once admitted, False if the call was cancelled
+        :raises TimeoutError: if the call's deadline passes while waiting
+        """
+        ticket = object()
+        start = perf_counter()
+        control.track(_Wakeup(self._changed))
+        with self._changed:
+            queue = self._queues[priority]
+            queue.append(ticket)
+            try:
+                while True:
+                    wait = control.remaining()
+                    if control.cancelled or (wait is not None and wait <= 0):
+                        break
+                    if self._may_start(priority, ticket):
+                        if self.bucket is None or self.bucket.take():
+                            self.in_flight += 1
+                            return True
+                        delay = self.bucket.delay()
+                        wait = delay if wait is None else min(wait, delay)
+                    self._changed.wait(wait)
+            finally:
+                queue.remove(ticket)
+                self._changed.notify_all()
+                self.metrics.histogram(
+                    f"pyplayht_scheduler_{priority}_wait_seconds",
+                    f"Time {priority} calls waited to start",
+                ).observe(perf_counter() - start)
+        if control.cancelled:
+            return False
+        raise TimeoutError("Deadline passed while waiting to start the stream")
+
+    def _release(self):
+        with self._changed:
+            self.in_flight -= 1
+            self._changed.notify_all()
+
+    @log_call(include_args=["priority"], include_result=False)
+    def __call__(
+        self, texts: list[str], timeout: float = None, priority: str = INTERACTIVE
+    ) -> TtsStream:
+        """Convert list of text strings to an audio byte stream, once admitted.
+
+        The call waits for its turn when first iterated; the timeout covers
+        the wait and the synthesis.
+
+        :param texts: string to process
+        :param timeout: Seconds to finish the synthesis, waiting included
+        :param priority: INTERACTIVE or BATCH
+        :return: TtsStream of TtsResponse objects
+        """
+        if priority not in self._queues:
+            raise ValueError(f"Unknown priority {priority!r}")
+        stream = TtsStream(timeout)
+        stream.responses = self._responses(texts, stream.control, priority)
+        return stream
+
+    @log_call(
+        include_args=["priority", "max_bytes", "max_chunks"], include_result=False
+    )
+    def stream(
+        self,
+        texts: list[str],
+        timeout: float = None,
+        max_bytes: int = 2**20,
+        max_chunks: int = 256,
+        priority: str = INTERACTIVE,
+    ) -> BufferedStream:
+        """Convert list of text strings to audio, read ahead into a bounded queue.
+
+        See GrpcTts.stream.
+        """
+        return BufferedStream(
+            self(texts, timeout, priority), max_bytes, max_chunks, self.metrics
+        )
+
+    def _responses(
+        self, texts: list[str], control: StreamControl, priority: str
+    ) -> Iterator[TtsResponse]:
+        """Yield the TtsResponses for texts, holding a slot until the stream ends."""
+        if not self._admit(priority, control):
+            return
+        try:
+            with control.track(self.tts(texts, control.remaining())) as responses:
+                yield from responses
+        finally:
+            self._release()
+
+    def close(self):
+        """Close the client."""
+        self.tts.close()
+
+    def __enter__(self) -> "Scheduler":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,282 @@
+"""Resumable batch synthesis: an append-only audio spool with a fixed-record index"""
+
+from .logging_config import log_call, logging
+
+logger = logging.getLogger(__name__)
+
+import mmap
+import os
+import tempfile
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from struct import Struct
+from typing import IO, Iterable, Iterator, NamedTuple
+
+from .api_pb2 import TtsParams
+from .cache import AudioCache
+from .container import WavMuxer
+from .tts import GrpcTts
+
+__all__ = ["Segment", "Spool", "synthesize_spooled"]
+
+# index record: segment number, data offset, data length, params hash
+_record = Struct("<IQQ16s")
+
+
+class Segment(NamedTuple):
+    """Index record of one spooled segment."""
+
+    number: int
+    offset: int
+    length: int
+    digest: bytes
+
+
+class Spool:
+    """Append-only spool of segment audio in directory, with a compact index.
+
+    ``audio`` holds each segment as one WAVE stream, back to back;
+    ``index`` holds one fixed-size record per segment (number, offset,
+    length and a hash of its params and texts); ``params`` holds the
+    TtsParams of the run, to resume it with the same voice and seed (see
+    saved_params). A record is only appended once its audio is on disk, so
+    after a crash the spool reopens with every completed segment and drops
+    the partial one. Completed segments are read back through a memory map,
+    never loaded whole.
+
+    >>> import tempfile
+    >>> directory = tempfile.mkdtemp()
+    >>> with Spool(directory) as spool:
+    ...     with spool.append(0, b'h' * 16) as audio:
+    ...         _ = audio.write(b'abc')
+    >>> with Spool(directory) as spool, spool.read(0) as audio:
+    ...     spool.segments, bytes(audio)
+    ([Segment(number=0, offset=0, length=3, digest=b'hhhhhhhhhhhhhhhh')], b'abc')
+
+    :param directory: Directory of the spool files (created if missing)
+    :param fsync: Sync each segment to disk before indexing it (survives power loss)
+    """
+
+    def __init__(self, directory: str | os.PathLike, fsync: bool = True):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.fsync = fsync
+        self._audio = open(self.directory / "audio", "a+b")
+        self._index = open(self.directory / "index", "a+b")
+        self._map: mmap.mmap = None
+        self.segments: list[Segment] = self._recover()
+
+    @staticmethod
+    def digest(params: TtsParams, texts: list[str]) -> bytes:
+        """Return the index hash of a segment's params and texts."""
+        return bytes.fromhex(AudioCache.key(params, texts))[:16]
+
+    @staticmethod
+    def saved_params(directory: str | os.PathLike) -> TtsParams | None:
+        """Return the TtsParams saved in the spool in directory, if any."""
+        try:
+            return TtsParams.FromString((Path(directory) / "params").read_bytes())
+        except FileNotFoundError:
+            return None
+
+    def save_params(self, params: TtsParams):
+        """Atomically save the TtsParams of the run (see saved_params)."""
+        path = self.directory / "params"
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with open(fd, "wb") as temp_file:
+                temp_file.write(params.SerializeToString())
+                temp_file.flush()
+                if self.fsync:
+                    os.fsync(temp_file.fileno())
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def _recover(self) -> list[Segment]:
+        """Read the index, dropping records past its last complete segment."""
+        self._index.seek(0)
+        data = self._index.read()
+        size = os.fstat(self._audio.fileno()).st_size
+        segments, end = [], 0
+        for offset in range(0, len(data) - _record.size + 1, _record.size):
+            segment = Segment(*_record.unpack_from(data, offset))
+            if (
+                segment.number != len(segments)
+                or segment.offset != end
+                or segment.offset + segment.length > size
+            ):
+                break
+            segments.append(segment)
+            end = segment.offset + segment.length
+        if len(segments) * _record.size != len(data) or end != size:
+            logger.warning(
+                "Dropping incomplete spool data after %d segments", len(segments)
+            )
+        self._truncate(segments)
+        return segments
+
+    def _truncate(self, segments: list[Segment]):
+        """Cut the spool files back to segments."""
+        end = segments[-1].offset + segments[-1].length if segments else 0
+        self._close_map()
+        self._audio.truncate(end)
+        self._index.truncate(len(segments) * _record.size)
+
+    @log_call(include_args=["number"])
+    def truncate(self, number: int):
+        """Drop segment number and every later segment."""
+        if number < len(self.segments):
+            del self.segments[number:]
+            self._truncate(self.segments)
+
+    def matches(self, number: int, digest: bytes) -> bool:
+        """Check if segment number is spooled with the same params and texts."""
+        return number < len(self.segments) and self.segments[number].digest == digest
+
+    @contextmanager
+    def append(self, number: int, digest: bytes) -> Iterator[IO[bytes]]:
+        """Append the audio of the next segment, indexing it once written.
+
+        On an error the partial audio is dropped.
+
+        :param number: Segment number, the number of segments spooled so far
+        :param digest: Hash of the segment's params and texts (see digest)
+        :yield: Binary file to write the segment's audio to
+        """
+        if number != len(self.segments):
+            raise ValueError(f"Segment {number} is not next ({len(self.segments)})")
+        offset = os.fstat(self._audio.fileno()).st_size
+        try:
+            yield self._audio
+            self._audio.flush()
+            if self.fsync:
+                os.fsync(self._audio.fileno())
+        except BaseException:
+            self._audio.truncate(offset)
+            raise
+        length = os.fstat(self._audio.fileno()).st_size - offset
+        segment = Segment(number, offset, length, digest)
+        self._index.write(_record.pack(*segment))
+        self._index.flush()
+        if self.fsync:
+            os.fsync(self._index.fileno())
+        self.segments.append(segment)
+
+    def _close_map(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def read(self, number: int) -> memoryview:
+        """Return the audio of segment number, from the memory map (release before truncating)."""
+        segment = self.segments[number]
+        if not segment.length:
+            return memoryview(b"")
+        if self._map is None or len(self._map) < segment.offset + segment.length:
+            self._close_map()
+            self._map = mmap.mmap(self._audio.fileno(), 0, access=mmap.ACCESS_READ)
+        return memoryview(self._map)[segment.offset : segment.offset + segment.length]
+
+    @log_call(include_args=[], include_result=False)
+    def assemble(self, output: IO[bytes]):
+        """Write every segment's audio to output, in order (a WavMuxer joins their headers)."""
+        for number in range(len(self.segments)):
+            with self.read(number) as audio:
+                output.write(audio)
+                output.flush()
+
+    def close(self):
+        self._close_map()
+        self._audio.close()
+        self._index.close()
+
+    def __enter__(self) -> "Spool":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _segment_audio(tts: GrpcTts, texts: list[str]) -> list[bytes]:
+    return [tts_response.data for tts_response in tts(texts)]
+
+
+@log_call(include_args=["concurrency"], include_result=False)
+def synthesize_spooled(
+    tts: GrpcTts,
+    segments: Iterable[list[str]],
+    spool: Spool,
+    concurrency: int = 1,
+    params: TtsParams = None,
+) -> int:
+    """Synthesize each segment (a request's texts) into spool, reusing spooled ones.
+
+    Segments already spooled with the same params and texts are skipped;
+    from the first one missing (or changed), the spool is cut back and
+    synthesis resumes, with up to concurrency segments in flight. The
+    params are saved in the spool: build the client of a later run from
+    them (default voice and seed are random in every process).
+
+    >>> import tempfile
+    >>> from pyplayht.fake import FakePlayHT
+    >>> directory, segments = tempfile.mkdtemp(), [['Hello.'], ['World.']]
+    >>> with FakePlayHT() as fake:
+    ...     for run in range(2):
+    ...         saved = Spool.saved_params(directory)
+    ...         with GrpcTts.default(
+    ...             fake.session(),
+    ...             *[saved] if saved else [],
+    ...             channel_credentials=fake.channel_credentials,
+    ...         ) as tts, Spool(directory) as spool:
+    ...             reused = synthesize_spooled(tts, segments, spool)
+    ...         reused, fake.servicer.requests
+    (0, 2)
+    (2, 2)
+
+    :param tts: GrpcTts client instance
+    :param segments: Texts of each request, in order
+    :param spool: Spool to resume and fill
+    :param concurrency: Number of requests in flight
+    :param params: TtsParams hashed into the index (default: tts.tts_params)
+    :return: The number of segments reused from the spool
+    """
+    params = tts.tts_params if params is None else params
+    reused, number = None, -1
+    window: deque[tuple[int, bytes, Future]] = deque()
+
+    def spool_next():
+        number, digest, future = window.popleft()
+        audio = future.result()
+        with spool.append(number, digest) as output, WavMuxer(output) as muxer:
+            for data in audio:
+                muxer.write(data)
+
+    with ThreadPoolExecutor(concurrency, thread_name_prefix="pyplayht") as executor:
+        try:
+            for number, texts in enumerate(segments):
+                digest = spool.digest(params, texts)
+                if reused is None:
+                    if spool.matches(number, digest):
+                        continue
+                    reused = number
+                    spool.truncate(number)
+                    spool.save_params(params)
+                    logger.info("Resuming spool at segment %d", number)
+                if len(window) == concurrency:
+                    spool_next()
+                window.append(
+                    (number, digest, executor.submit(_segment_audio, tts, texts))
+                )
+            while window:
+                spool_next()
+        finally:
+            for _, _, future in window:
+                future.cancel()
+    if reused is None:
+        reused = number + 1
+        spool.truncate(reused)
+    return reused
@@ -0,0 +1,222 @@
+"""Bounded read-ahead of TtsResponse streams, for sync and async consumers"""
+
+from .logging_config import log_call, logging
+
+logger = logging.getLogger(__name__)
+
+import asyncio
+import threading
+from collections import deque
+from time import perf_counter
+from typing import Iterator
+
+from .metrics import COUNT_BUCKETS, METRICS, Metrics
+
+__all__ = ["BufferedStream"]
+
+_END = object()
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class BufferedStream:
+    """TtsResponses read ahead by a background thread into a bounded queue.
+
+    The reader drains the gRPC stream while the consumer is busy, so a fast
+    consumer never waits on a network round trip per chunk. Once max_chunks
+    chunks or max_bytes of audio are queued, the reader stops reading and
+    gRPC flow control pushes back on the server, so a slow consumer bounds
+    memory instead of growing it.
+
+    Iterate it with ``for`` from a thread, or with ``async for`` from an
+    event loop (which is never blocked). Its depth, max_depth, stall_secs
+    (reader blocked on a full queue) and wait_secs (consumer waiting on an
+    empty queue) are recorded in metrics when the stream ends.
+
+    >>> with BufferedStream(iter([b'a', b'b', b'c']), max_chunks=2) as stream:
+    ...     list(stream), stream.max_depth <= 2
+    ([b'a', b'b', b'c'], True)
+
+    :param responses: TtsResponse iterator (a TtsStream is cancelled on close)
+    :param max_bytes: Queued audio bytes before the reader pauses
+    :param max_chunks: Queued chunks before the reader pauses
+    :param metrics: Metrics registry for the queue statistics
+    """
+
+    def __init__(
+        self,
+        responses: Iterator,
+        max_bytes: int = 2**20,
+        max_chunks: int = 256,
+        metrics: Metrics = METRICS,
+    ):
+        self.responses = responses
+        self.max_bytes = max_bytes
+        self.max_chunks = max_chunks
+        self.metrics = metrics
+        self.depth_bytes = 0
+        self.max_depth = 0
+        self.stall_secs = 0.0
+        self.wait_secs = 0.0
+        self._chunks = deque()
+        self._end = None
+        self._closed = False
+        self._recorded = False
+        self._lock = threading.Lock()
+        self._readable = threading.Condition(self._lock)
+        self._writable = threading.Condition(self._lock)
+        self._waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self._reader = threading.Thread(
+            target=self._read, name="pyplayht-reader", daemon=True
+        )
+        self._reader.start()
+
+    @property
+    def depth(self) -> int:
+        """Return the number of queued chunks."""
+        return len(self._chunks)
+
+    @staticmethod
+    def _size(tts_response) -> int:
+        return len(getattr(tts_response, "data", tts_response))
+
+    def _read(self):
+        """Move responses into the queue until the end of the stream, or close()."""
+        end = _END
+        try:
+            for tts_response in self.responses:
+                if not self._put(tts_response):
+                    break
+        except Exception as error:
+            end = error
+        with self._lock:
+            self._end = end
+            self._wake()
+
+    def _put(self, tts_response) -> bool:
+        """Queue tts_response, waiting while the queue is full; False once closed."""
+        size = self._size(tts_response)
+        with self._lock:
+            if self._full(size):
+                start = perf_counter()
+                while not self._closed and self._full(size):
+                    self._writable.wait()
+                self.stall_secs += perf_counter() - start
+            if self._closed:
+                return False
+            self._chunks.append(tts_response)
+            self.depth_bytes += size
+            self.max_depth = max(self.max_depth, len(self._chunks))
+            self._wake()
+        return True
+
+    def _full(self, size: int) -> bool:
+        """Check if size more bytes would overflow the queue (hold the lock)."""
+        return bool(self._chunks) and (
+            len(self._chunks) >= self.max_chunks
+            or self.depth_bytes + size > self.max_bytes
+        )
+
+    def _wake(self):
+        """Wake the waiting consumers, threads and coroutines (hold the lock)."""
+        self._readable.notify_all()
+        for loop, future in self._waiters:
+            loop.call_soon_threadsafe(_resolve, future)
+        self._waiters.clear()
+
+    def _take(self):
+        """Dequeue the oldest chunk (hold the lock)."""
+        tts_response = self._chunks.popleft()
+        self.depth_bytes -= self._size(tts_response)
+        self._writable.notify()
+        return tts_response
+
+    def _ended(self):
+        """Raise the reader's error, or the end of iteration."""
+        self._record()
+        if self._end is not _END and self._end is not None:
+            error, self._end = self._end, _END
+            raise error
+
+    def __iter__(self) -> "BufferedStream":
+        return self
+
+    def __next__(self):
+        with self._lock:
+            if not self._chunks and self._end is None:
+                start = perf_counter()
+                while not self._chunks and self._end is None:
+                    self._readable.wait()
+                self.wait_secs += perf_counter() - start
+            if self._chunks:
+                return self._take()
+        self._ended()
+        raise StopIteration
+
+    def __aiter__(self) -> "BufferedStream":
+        return self
+
+    async def __anext__(self):
+        start = None
+        while True:
+            with self._lock:
+                if self._chunks:
+                    if start is not None:
+                        self.wait_secs += perf_counter() - start
+                    return self._take()
+                if self._end is not None:
+                    break
+                loop = asyncio.get_running_loop()
+                future = loop.create_future()
+                self._waiters.append((loop, future))
+            start = start or perf_counter()
+            await future
+        self._ended()
+        raise StopAsyncIteration
+
+    def _record(self):
+        """Record the queue statistics once."""
+        if self._recorded:
+            return
+        self._recorded = True
+        self.metrics.histogram(
+            "pyplayht_stream_queue_max_depth",
+            "Most chunks queued ahead of a stream consumer",
+            COUNT_BUCKETS,
+        ).observe(self.max_depth)
+        self.metrics.histogram(
+            "pyplayht_stream_stall_seconds",
+            "Time a stream reader waited on a full queue (backpressure)",
+        ).observe(self.stall_secs)
+        self.metrics.histogram(
+            "pyplayht_stream_wait_seconds",
+            "Time a stream consumer waited on an empty queue",
+        ).observe(self.wait_secs)
+
+    @log_call(include_result=False)
+    def close(self):
+        """Stop reading, cancel the synthesis and drop the queued chunks."""
+        with self._lock:
+            self._closed = True
+            self._chunks.clear()
+            self.depth_bytes = 0
+            self._writable.notify_all()
+        cancel = getattr(self.responses, "cancel", None)
+        if cancel is not None:
+            cancel()
+        self._record()
+
+    def __enter__(self) -> "BufferedStream":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    async def __aenter__(self) -> "BufferedStream":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,290 @@
+"""Text segmentation for TTS requests, for whole lines or incremental text"""
+
+from .logging_config import log_call, logging
+
+logger = logging.getLogger(__name__)
+
+import asyncio
+import textwrap
+import threading
+from itertools import islice
+from queue import Empty, SimpleQueue
+from time import monotonic
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator
+
+__all__ = [
+    "Segmenter",
+    "asegment_stream",
+    "batched",
+    "ensure_limits",
+    "pack",
+    "segment_stream",
+    "split_words",
+    "HARD_CHARACTER_MAX",
+    "LINE_LIMIT",
+    "SENTENCE_END_SEARCH",
+    "SOFT_CHARACTER_MAX",
+]
+
+LINE_LIMIT = 6
+SOFT_CHARACTER_MAX = 350
+HARD_CHARACTER_MAX = 500
+
+__wrapper = textwrap.TextWrapper(
+    width=HARD_CHARACTER_MAX,
+    expand_tabs=False,
+    replace_whitespace=True,
+    fix_sentence_endings=True,
+    break_long_words=False,
+    drop_whitespace=True,
+    break_on_hyphens=False,
+    max_lines=LINE_LIMIT,
+)
+# noinspection PyProtectedMember
+__chunk_splitter = __wrapper._split_chunks
+
+SENTENCE_END_SEARCH = __wrapper.sentence_end_re.search
+WHITESPACE_TRANS = {}.fromkeys(__wrapper.unicode_whitespace_trans)
+
+
+def split_words(text: str) -> list[str]:
+    """Split text into words, dropping the whitespace between them.
+
+    >>> split_words(" One  two.\tThree ")
+    ['One', 'two.', 'Three']
+    """
+    return [
+        chunk for chunk in __chunk_splitter(text) if chunk.translate(WHITESPACE_TRANS)
+    ]
+
+
+def batched(iterable: Iterable[str], size: int) -> Iterator[list[str]]:
+    """Batch iterable into lists of up to size items.
+
+    >>> list(batched('abcde', 2))
+    [['a', 'b'], ['c', 'd'], ['e']]
+    """
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def pack(pieces: Iterable[str], limit: int) -> list[str]:
+    """Greedily join pieces with spaces into strings of at most limit characters.
+    A single piece longer than limit is kept whole.
+
+    >>> pack(['ab', 'cd', 'efgh', 'i'], 5)
+    ['ab cd', 'efgh', 'i']
+    """
+    packed, current = [], ""
+    for piece in pieces:
+        if current and len(current) + 1 + len(piece) > limit:
+            packed.append(current)
+            current = piece
+        else:
+            current = f"{current} {piece}" if current else piece
+    if current:
+        packed.append(current)
+    return packed
+
+
+def ensure_limits(
+    line: str, sentence_threshold=SOFT_CHARACTER_MAX, word_threshold=HARD_CHARACTER_MAX
+) -> list[str]:
+    """Given a line, split it by sentences if it is over length sentence_threshold.
+    If a sentence is over length word_threshold, split it by words.
+
+    :param line: Line of text with sentence punctuation.
+    :param sentence_threshold: Length to begin splitting by sentences.
+    :param word_threshold: Length to begin splitting by words.
+    :returns list[str]: Lines of text split by sentences.
+
+    >>> ensure_limits("One  two.\tThree four five. Six.", 10, 12)
+    ['One two.', 'Three four', 'five. Six.']
+    >>> ensure_limits(" ")
+    []
+    """
+    words = split_words(line)
+    text = " ".join(words)
+    if len(text) <= sentence_threshold:
+        return [text] if text else []
+    pieces, sentence = [], []
+    for word in words + [""]:
+        if word:
+            sentence.append(word)
+        if sentence and (not word or SENTENCE_END_SEARCH(word)):
+            text = " ".join(sentence)
+            if len(text) > word_threshold:
+                pieces.extend(pack(sentence, word_threshold))
+            else:
+                pieces.append(text)
+            sentence = []
+    return pack(pieces, sentence_threshold)
+
+
+class Segmenter:
+    """Cut text arriving in fragments into TTS segments as soon as sentences end.
+
+    Text is held back until a sentence ends (with the whitespace after it,
+    so a fragment ending in "3." is not mistaken for the end of "3.5"), or
+    until it grows past sentence_threshold, when it is cut between words.
+
+    >>> segmenter = Segmenter()
+    >>> segmenter.feed("Hello wor"), segmenter.feed("ld. How"), segmenter.feed(" are you?")
+    ([], ['Hello world.'], [])
+    >>> segmenter.pending, segmenter.flush(), segmenter.pending
+    (True, ['How are you?'], False)
+
+    :param sentence_threshold: Longest segment, unless a single word is longer
+    :param word_threshold: Longest sentence before splitting it by words
+    """
+
+    def __init__(
+        self,
+        sentence_threshold: int = SOFT_CHARACTER_MAX,
+        word_threshold: int = HARD_CHARACTER_MAX,
+    ):
+        self.sentence_threshold = sentence_threshold
+        self.word_threshold = word_threshold
+        self._text = ""
+
+    @property
+    def pending(self) -> bool:
+        """Check if text is held back, waiting for the end of its sentence."""
+        return bool(self._text.translate(WHITESPACE_TRANS))
+
+    def feed(self, fragment: str) -> list[str]:
+        """Add a fragment of text, and return the segments it completes."""
+        self._text += fragment
+        words = split_words(self._text)
+        trailing_space = self._text[-1:].isspace()
+        complete = len(words) if trailing_space else len(words) - 1
+        start, segments = 0, []
+        for index in range(complete - 1, -1, -1):
+            if SENTENCE_END_SEARCH(words[index]):
+                start = index + 1
+                segments = ensure_limits(
+                    " ".join(words[:start]),
+                    self.sentence_threshold,
+                    self.word_threshold,
+                )
+                break
+        if len(" ".join(words[start:complete])) > self.sentence_threshold:
+            pieces = pack(words[start:complete], self.sentence_threshold)
+            segments.extend(pieces[:-1])
+            start = complete - len(pieces[-1].split(" "))
+        rest = " ".join(words[start:])
+        self._text = f"{rest} " if rest and trailing_space else rest
+        return segments
+
+    def flush(self) -> list[str]:
+        """Return the held back text as segments, whether or not its sentence ended."""
+        text, self._text = self._text, ""
+        return ensure_limits(text, self.sentence_threshold, self.word_threshold)
+
+
+_END = object()
+
+
+def _pump(fragments: Iterable[str], queue: SimpleQueue):
+    """Put the fragments into queue, then _END (or the raised exception)."""
+    try:
+        for fragment in fragments:
+            queue.put(fragment)
+    except Exception as error:
+        queue.put(error)
+    else:
+        queue.put(_END)
+
+
+@log_call(include_args=["max_wait"], include_result=False)
+def segment_stream(
+    fragments: Iterable[str], max_wait: float = None, **limits: int
+) -> Iterator[str]:
+    """Segment text fragments incrementally (see Segmenter).
+
+    >>> list(segment_stream(["One. Tw", "o. Thr", "ee"]))
+    ['One.', 'Two.', 'Three']
+
+    :param fragments: Text fragments, for example tokens from a language model
+    :param max_wait: Seconds text may be held back before it is cut anyway
+        (read in a background thread; default: wait for the sentence end)
+    :param **limits: sentence_threshold and word_threshold of the Segmenter
+    :yield: Segments, in order
+    """
+    segmenter = Segmenter(**limits)
+    if max_wait is None:
+        for fragment in fragments:
+            yield from segmenter.feed(fragment)
+        yield from segmenter.flush()
+        return
+    queue = SimpleQueue()
+    threading.Thread(
+        target=_pump, args=(fragments, queue), name="pyplayht-text", daemon=True
+    ).start()
+    since = None
+    while True:
+        timeout = None if since is None else max(since + max_wait - monotonic(), 0)
+        try:
+            fragment = queue.get(timeout=timeout)
+        except Empty:
+            yield from segmenter.flush()
+            since = None
+            continue
+        if fragment is _END:
+            break
+        if isinstance(fragment, Exception):
+            raise fragment
+        segments = segmenter.feed(fragment)
+        yield from segments
+        if not segmenter.pending:
+            since = None
+        elif since is None or segments:
+            since = monotonic()
+    yield from segmenter.flush()
+
+
+async def asegment_stream(
+    fragments: AsyncIterable[str], max_wait: float = None, **limits: int
+) -> AsyncIterator[str]:
+    """Segment async text fragments incrementally (see segment_stream).
+
+    :param fragments: Async iterable of text fragments
+    :param max_wait: Seconds text may be held back before it is cut anyway
+    :param **limits: sentence_threshold and word_threshold of the Segmenter
+    :yield: Segments, in order
+    """
+    segmenter = Segmenter(**limits)
+    iterator = aiter(fragments)
+    since, next_fragment = None, None
+    try:
+        while True:
+            if next_fragment is None:
+                next_fragment = asyncio.ensure_future(anext(iterator, _END))
+            timeout = (
+                None
+                if since is None or max_wait is None
+                else max(since + max_wait - monotonic(), 0)
+            )
+            done, _ = await asyncio.wait((next_fragment,), timeout=timeout)
+            if not done:
+                for segment in segmenter.flush():
+                    yield segment
+                since = None
+                continue
+            fragment, next_fragment = next_fragment.result(), None
+            if fragment is _END:
+                break
+            segments = segmenter.feed(fragment)
+            for segment in segments:
+                yield segment
+            if not segmenter.pending:
+                since = None
+            elif since is None or segments:
+                since = monotonic()
+        for segment in segmenter.flush():
+            yield segment
+    finally:
+        if next_fragment is not None:
+            next_fragment.cancel()
+            await asyncio.gather(next_fragment, return_exceptions=True)
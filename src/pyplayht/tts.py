@@ -1,49 +1,64 @@
 """gPRC Tts Client(s)"""
 
-from .api_pb2 import TtsRequest
-
-"""Authentication for Play.HT API"""
 from .logging_config import log_call, logging
 
 logger = logging.getLogger(__name__)
 
+import asyncio
+import threading
+from contextlib import ExitStack
 from dataclasses import asdict, dataclass, field
+from queue import Empty, SimpleQueue
 from random import choice, randint
-from typing import Iterable
+from time import monotonic
+from typing import AsyncIterator, Callable, Generator, Iterator
 
 from grpc import (
     Channel,
+    ChannelCredentials,
     Compression,
+    RpcError,
+    StatusCode,
+    aio,
     experimental,
-    secure_channel,
     ssl_channel_credentials,
 )
 
-from .auth import Session
+from .auth import Lease, Session
+from .cache import AudioCache
+from .channels import LEAST_OUTSTANDING, ChannelPool
+from .metrics import METRICS, Metrics
+from .retry import RetryPolicy
+from .streaming import BufferedStream
 
 __all__ = [
+    "AsyncGrpcTts",
     "GrpcTts",
     "HyperParameters",
     "JobParameters",
     "TtsParams",
     "Format",
     "Quality",
+    "StreamControl",
+    "TtsStream",
 ]
 
 ASYNC_OPTIONS = ()
 SYNC_OPTIONS = ((experimental.ChannelOptions.SingleThreadedUnaryStream, 1),)
+TTS_METHOD = "/playht.v1.Tts/Tts"
 VOICES = (
     "s3://voice-cloning-zero-shot/d9ff78ba-d016-47f6-b0ef-dd630f59414e/female-cs/manifest.json",
     "s3://peregrine-voices/oliver_narrative2_parrot_saad/manifest.json",
 )
 try:
-    import api_pb2 as api
-    import api_pb2_grpc as api_grpc
-except ImportError:
+    from . import api_pb2 as api
+    from . import api_pb2_grpc as api_grpc
+except ImportError:  # generated stubs incompatible with the installed protobuf
     from grpc import protos_and_services
 
     api, api_grpc = protos_and_services(f"{__package__}/api.proto")
 
+Code = api.Code
 Format = api.Format
 Quality = api.Quality
 TtsParams = api.TtsParams
@@ -53,6 +68,29 @@ TtsStub = api_grpc.TtsStub
 Tts = api_grpc.Tts
 
 
+def raw_tts_stub(channel: Channel | aio.Channel) -> Callable:
+    """Return a Tts RPC callable that sends already serialized TtsRequest bytes."""
+    return channel.unary_stream(
+        TTS_METHOD, response_deserializer=TtsResponse.FromString
+    )
+
+
+def text_request(texts: list[str]) -> bytes:
+    """Serialize a TtsRequest holding only texts.
+
+    Appended to a serialized TtsRequest, protobuf merges it into that
+    request's params, adding the texts to the (empty) repeated text field.
+
+    >>> request = TtsRequest.FromString(
+    ...     TtsRequest(lease=b'x', params=TtsParams(voice='v')).SerializeToString()
+    ...     + text_request(['a', 'b'])
+    ... )
+    >>> request.lease, request.params.voice, list(request.params.text)
+    (b'x', 'v', ['a', 'b'])
+    """
+    return TtsRequest(params=TtsParams(text=texts)).SerializeToString()
+
+
 @log_call
 def tts_seed():
     """Generate a seed for TtsParams"""
@@ -131,13 +169,18 @@ class JobParameters:
         )
 
 
-class GrpcTts:
-    """Synchronous TTS Client service."""
+class _GrpcTtsBase:
+    """Lease and TtsParams handling shared by the TTS clients.
+
+    The lease and tts_params are serialized into a request template once per
+    lease rotation; each call only appends its texts, so calls never mutate
+    shared state and one client may be shared between threads.
+    """
 
-    channel: Channel
+    default_options: tuple[tuple[str, int], ...] = ()
     session: Session
-    stub_tts: Tts
     tts_params: TtsParams
+    _template: tuple[bytes, bytes] = (b"", b"")
 
     @property
     @log_call(include_result=False)
@@ -151,60 +194,611 @@ class GrpcTts:
         """Return the current lease's .grpc_addr for the Channel.target"""
         return self.session.lease.grpc_addr
 
+    @classmethod
     @log_call(include_args=["options"], include_result=False)
-    def __init__(
-        self, session: Session = None, *params: TtsParams, options=SYNC_OPTIONS
+    def default(
+        cls,
+        session: Session = None,
+        *params: TtsParams,
+        options: tuple[tuple[str, int]] = None,
+        **kwargs,
     ):
-        """Synchronous TTS GRPC Client.
+        """Create a TTS gRPC client with defaults and optional overrides.
 
         :param session: Grant Session for Authorization
         :param *params: List of TtsParams objects (later overrides earlier)
         :param options: gRPC ChannelOptions
+        :param **kwargs: Other client keyword arguments
         """
-        self.session = session
+        session = session or Session.default()
+        if kwargs.get("cache") is not None and not any(
+            param.HasField("seed") for param in params
+        ):
+            logger.warning("Not caching audio: no fixed seed in params")
+            kwargs["cache"] = None
+        options = options or cls.default_options
+        return cls(session, cls.default_params(*params), options=options, **kwargs)
+
+    @staticmethod
+    def default_params(*params: TtsParams) -> TtsParams:
+        """Merge the default hyper and job parameters with params (later overrides earlier).
+
+        The defaults draw a random seed and voice: merge them once and share
+        the result between clients that must sound the same.
+
+        >>> params = GrpcTts.default_params(TtsParams(speed=2))
+        >>> params.speed, params.HasField('seed'), params.voice in VOICES
+        (2.0, True, True)
+        """
+        merged = TtsParams()
+        for param in (HyperParameters.default(), JobParameters.default()) + params:
+            merged.MergeFrom(param)
+        return merged
+
+    def _merge_params(self, *params: TtsParams):
+        """Merge params into tts_params (later overrides earlier)."""
         self.tts_params = TtsParams()
         for param in params:
             self.tts_params.MergeFrom(param)
-        self.channel = secure_channel(
+        self.tts_params.ClearField("text")
+        self._template = (b"", b"")
+
+    def _request(
+        self, lease: Lease, texts: list[str], params: TtsParams = None
+    ) -> bytes:
+        """Return the serialized TtsRequest for texts (or complete params) under lease."""
+        if params is not None:
+            return TtsRequest(lease=lease.token, params=params).SerializeToString()
+        token, template = self._template
+        if token != lease.token:
+            template = TtsRequest(
+                lease=lease.token, params=self.tts_params
+            ).SerializeToString()
+            self._template = lease.token, template
+        return template + text_request(texts)
+
+
+class GrpcTts(_GrpcTtsBase):
+    """Synchronous TTS Client service."""
+
+    default_options = SYNC_OPTIONS
+    metrics: Metrics = METRICS
+    pool: ChannelPool
+
+    @log_call(
+        include_args=["options", "pool_size", "strategy", "retry"], include_result=False
+    )
+    def __init__(
+        self,
+        session: Session = None,
+        *params: TtsParams,
+        options=SYNC_OPTIONS,
+        pool_size: int = 1,
+        strategy: str = LEAST_OUTSTANDING,
+        cache: AudioCache = None,
+        channel_credentials: ChannelCredentials = None,
+        retry: RetryPolicy = None,
+        timeout: float = None,
+    ):
+        """Synchronous TTS GRPC Client.
+
+        :param session: Grant Session for Authorization
+        :param *params: List of TtsParams objects (later overrides earlier)
+        :param options: gRPC ChannelOptions
+        :param pool_size: Number of Channels (connections) to spread streams across
+        :param strategy: Channel selection, LEAST_OUTSTANDING or ROUND_ROBIN
+        :param cache: AudioCache to replay repeated requests from (requires a fixed seed)
+        :param channel_credentials: gRPC ChannelCredentials (default: SSL)
+        :param retry: RetryPolicy for failed and slow streams (default: RetryPolicy())
+        :param timeout: Default seconds to finish each synthesis (default: no deadline)
+        """
+        self.session = session
+        self._merge_params(*params)
+        self.retry = RetryPolicy() if retry is None else retry
+        self.timeout = timeout
+        if cache is not None and not self.tts_params.HasField("seed"):
+            logger.warning("Not caching audio: no fixed seed in params")
+            cache = None
+        self.cache = cache
+        self.pool = ChannelPool(
             self.target,
-            credentials=ssl_channel_credentials(),
-            options=options,
-            compression=Compression.Gzip,
+            pool_size,
+            stub_factory=raw_tts_stub,
+            options=tuple(options) + self.retry.channel_options(),
+            credentials=channel_credentials,
+            strategy=strategy,
         )
-        self.stub_tts: Tts = TtsStub(self.channel).Tts
+        self.session.add_listener(self._on_lease)
+
+    def _on_lease(self, lease: Lease):
+        """Move the channels (in the background) when a new Lease changes the target."""
+        self.pool.retarget(lease.grpc_addr)
+
+    def warm(self, timeout: float = None):
+        """Connect the channels now, so the first calls skip TLS and HTTP/2 setup.
+
+        :param timeout: Seconds to wait for the channels
+        """
+        self.pool.warm(timeout)
+
+    @log_call(include_result=False)
+    def __call__(self, texts: list[str], timeout: float = None) -> "TtsStream":
+        """Convert list of text strings to an audio byte stream.
+
+        :param texts: string to process
+        :param timeout: Seconds to finish the synthesis, retries included (default: self.timeout)
+        :return: TtsStream of TtsResponse objects
+        """
+        stream = TtsStream(self.timeout if timeout is None else timeout)
+        stream.responses = self._responses(texts, stream.control)
+        return stream
+
+    @log_call(include_result=False)
+    def forward(self, params: TtsParams, timeout: float = None) -> "TtsStream":
+        """Synthesize another client's complete TtsParams (texts included) under this session's lease.
+
+        The client's params replace tts_params; retries, hedging and the
+        cache (for seeded params) apply as for any other call.
+
+        :param params: TtsParams of the request, texts included
+        :param timeout: Seconds to finish the synthesis, retries included (default: self.timeout)
+        :return: TtsStream of TtsResponse objects
+        """
+        stream = TtsStream(self.timeout if timeout is None else timeout)
+        stream.responses = self._responses(list(params.text), stream.control, params)
+        return stream
+
+    @log_call(include_args=["max_bytes", "max_chunks"], include_result=False)
+    def stream(
+        self,
+        texts: list[str],
+        timeout: float = None,
+        max_bytes: int = 2**20,
+        max_chunks: int = 256,
+    ) -> BufferedStream:
+        """Convert list of text strings to audio, read ahead into a bounded queue.
+
+        A background thread drains the gRPC stream into the queue, pausing
+        (and so pushing back on the server) while it is full. Iterate the
+        result with ``for`` or ``async for``; closing it cancels the synthesis.
+
+        :param texts: string to process
+        :param timeout: Seconds to finish the synthesis, retries included (default: self.timeout)
+        :param max_bytes: Queued audio bytes before reading pauses
+        :param max_chunks: Queued chunks before reading pauses
+        :return: BufferedStream of TtsResponse objects
+        """
+        return BufferedStream(self(texts, timeout), max_bytes, max_chunks, self.metrics)
+
+    def _responses(
+        self, texts: list[str], control: "StreamControl", params: TtsParams = None
+    ) -> Iterator[TtsResponse]:
+        """Yield the TtsResponses for texts (or complete params), from the cache or the server."""
+        lease = self.session.lease
+        if lease.grpc_addr != self.pool.target:
+            self.pool.retarget(lease.grpc_addr)
+        if self.cache is None or (params is not None and not params.HasField("seed")):
+            yield from self._stream(lease, texts, control, params)
+            return
+        if params is None:
+            key = self.cache.key(self.tts_params, texts)
+        else:
+            key_params = TtsParams()
+            key_params.CopyFrom(params)
+            key_params.ClearField("text")
+            key = self.cache.key(key_params, texts)
+        chunks = self.cache.get(key)
+        if chunks is not None:
+            yield from self.cache.replay(chunks)
+            return
+        chunks = []
+        for tts_response in self._stream(lease, texts, control, params):
+            chunks.append(tts_response.SerializeToString())
+            yield tts_response
+            if tts_response.status.code == Code.CODE_ERROR:
+                return
+        self.cache.put(key, chunks)
+
+    def _stream(
+        self,
+        lease: Lease,
+        texts: list[str],
+        control: "StreamControl",
+        params: TtsParams = None,
+    ) -> Iterator[TtsResponse]:
+        """Stream the responses for texts (or complete params), retrying failed calls by the retry policy.
+
+        A retried call skips the sequences already yielded, so no chunk repeats.
+        """
+        policy, yielded, attempt = self.retry, -1, 1
+        seeded = (self.tts_params if params is None else params).HasField("seed")
+        while True:
+            request = self._request(lease, texts, params)
+            try:
+                for tts_response in self._attempt(request, control):
+                    if attempt > 1 and tts_response.sequence <= yielded:
+                        continue
+                    yielded = tts_response.sequence
+                    yield tts_response
+                return
+            except RpcError as error:
+                code = error.code()
+                if attempt >= policy.max_attempts:
+                    raise
+                if code not in policy.auth_codes | policy.retryable_codes:
+                    raise
+                if yielded >= 0 and not seeded:
+                    raise  # a new seed would not continue the audio already yielded
+                if code in policy.auth_codes:
+                    lease = self.session.invalidate(lease)
+                else:
+                    backoff = policy.backoff(attempt)
+                    remaining = control.remaining()
+                    if remaining is not None and backoff >= remaining:
+                        raise
+                    control.wait(backoff)
+                attempt += 1
+                logger.warning("Retrying Tts stream (attempt %d): %s", attempt, code)
+                self.metrics.counter(
+                    "pyplayht_tts_retries_total", "Tts calls retried"
+                ).inc()
+
+    def _attempt(
+        self, request: bytes, control: "StreamControl"
+    ) -> Iterator[TtsResponse]:
+        """Stream the responses to a serialized request from a pooled channel.
+
+        The call is cancelled as soon as this generator is closed or collected.
+        """
+        if self.retry.hedge_after is not None:
+            yield from self._hedged(request, control)
+            return
+        with self.pool.stub() as stub_tts:
+            # noinspection PyCallingNonCallable
+            call = control.track(stub_tts(request, timeout=control.remaining()))
+            try:
+                yield from self.metrics.measure_stream(call)
+            finally:
+                call.cancel()
+
+    def _hedged(
+        self, request: bytes, control: "StreamControl"
+    ) -> Iterator[TtsResponse]:
+        """Stream from the first of several calls to send a chunk, cancelling the others.
+
+        A hedged call starts whenever hedge_after seconds pass without a first
+        chunk, up to max_hedges times.
+        """
+        arrivals, calls, failures = SimpleQueue(), [], 0
+        timer = self.metrics.stream_timer()
+        with ExitStack() as stubs:
+
+            def launch():
+                stub_tts = stubs.enter_context(self.pool.stub())
+                # noinspection PyCallingNonCallable
+                call = control.track(stub_tts(request, timeout=control.remaining()))
+                calls.append(call)
+                threading.Thread(
+                    target=_first_response, args=(call, arrivals), daemon=True
+                ).start()
+
+            try:
+                launch()
+                while True:
+                    hedging = len(calls) <= self.retry.max_hedges
+                    try:
+                        call, first = arrivals.get(
+                            timeout=self.retry.hedge_after if hedging else None
+                        )
+                    except Empty:
+                        self.metrics.counter(
+                            "pyplayht_tts_hedges_total", "Hedged Tts calls"
+                        ).inc()
+                        launch()
+                        continue
+                    if not isinstance(first, RpcError):
+                        break
+                    failures += 1
+                    if failures == len(calls):
+                        raise first
+                for other in calls:
+                    if other is not call:
+                        other.cancel()
+                if first is None:
+                    return
+                timer.chunk(first)
+                yield first
+                for tts_response in call:
+                    timer.chunk(tts_response)
+                    yield tts_response
+            except Exception:
+                timer.failed()
+                raise
+            finally:
+                for each in calls:
+                    each.cancel()
+                timer.finish()
+
+    def close(self):
+        """Close the channels, cancelling active streams."""
+        self.session.remove_listener(self._on_lease)
+        self.pool.close()
+
+    def __enter__(self) -> "GrpcTts":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class StreamControl:
+    """Deadline and cancel state of one synthesis.
+
+    A TtsStream owns it and the generator producing the stream's responses
+    holds only it, never the TtsStream: no reference cycle, so dropping the
+    TtsStream frees the generator (cancelling its calls) at once rather
+    than at the next cyclic garbage collection.
+
+    :param timeout: Seconds until the deadline (default: no deadline)
+    """
+
+    def __init__(self, timeout: float = None):
+        self.deadline = None if timeout is None else monotonic() + timeout
+        self._cancelled = threading.Event()
+        self._calls = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def remaining(self) -> float | None:
+        """Return the seconds left until the deadline, if any."""
+        return None if self.deadline is None else self.deadline - monotonic()
+
+    def wait(self, seconds: float):
+        """Sleep for seconds, waking early when cancelled."""
+        self._cancelled.wait(seconds)
+
+    def track(self, call):
+        """Register an RPC call (anything with cancel()) to cancel with the synthesis, and return it."""
+        with self._lock:
+            self._calls.append(call)
+        if self.cancelled:
+            call.cancel()
+        return call
+
+    def cancel(self):
+        """Cancel the synthesis (from any thread)."""
+        self._cancelled.set()
+        with self._lock:
+            calls = list(self._calls)
+        for call in calls:
+            call.cancel()
+
+
+class TtsStream:
+    """TtsResponse iterator of one synthesis, with a deadline and a cancel handle.
+
+    cancel() may be called from any thread: it cancels the RPC and ends the
+    iteration without an error. Closing (or dropping) the stream also
+    cancels its RPC, so abandoned streams free their server capacity.
+
+    >>> stream = TtsStream(timeout=None)
+    >>> stream.responses = (chunk for chunk in ['chunk'])
+    >>> stream.cancel()
+    >>> list(stream), stream.cancelled
+    ([], True)
+
+    A dropped stream cancels its call without waiting for the garbage collector:
+
+    >>> import gc
+    >>> class Call:
+    ...     def cancel(self):
+    ...         print('cancelled')
+    >>> def responses(control):
+    ...     call = control.track(Call())
+    ...     try:
+    ...         yield 'chunk'
+    ...     finally:
+    ...         call.cancel()
+    >>> gc.disable()
+    >>> stream = TtsStream()
+    >>> stream.responses = responses(stream.control)
+    >>> next(stream)
+    'chunk'
+    >>> del stream
+    cancelled
+    >>> gc.enable()
+
+    :param timeout: Seconds until the deadline (default: no deadline)
+    """
+
+    responses: Generator[TtsResponse, None, None] = None
+
+    def __init__(self, timeout: float = None):
+        self.control = StreamControl(timeout)
+
+    @property
+    def deadline(self) -> float | None:
+        return self.control.deadline
+
+    @property
+    def cancelled(self) -> bool:
+        return self.control.cancelled
+
+    def remaining(self) -> float | None:
+        """Return the seconds left until the deadline, if any."""
+        return self.control.remaining()
+
+    def wait(self, seconds: float):
+        """Sleep for seconds, waking early when cancelled."""
+        self.control.wait(seconds)
+
+    def track(self, call):
+        """Register an RPC call to cancel with the stream, and return it."""
+        return self.control.track(call)
+
+    def cancel(self):
+        """Cancel the synthesis (from any thread)."""
+        self.control.cancel()
+
+    def close(self):
+        """Cancel the synthesis and release the stream (from the consuming thread)."""
+        self.cancel()
+        if self.responses is not None:
+            self.responses.close()
+
+    def __iter__(self) -> "TtsStream":
+        return self
+
+    def __next__(self) -> TtsResponse:
+        if self.cancelled:
+            self.close()
+            raise StopIteration
+        try:
+            return next(self.responses)
+        except RpcError as error:
+            if self.cancelled and error.code() == StatusCode.CANCELLED:
+                self.close()
+                raise StopIteration from None
+            raise
+
+    def __enter__(self) -> "TtsStream":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _first_response(call: Iterator[TtsResponse], arrivals: SimpleQueue):
+    """Put call and its first response (None if empty, or its RpcError) in arrivals."""
+    try:
+        arrivals.put((call, next(call, None)))
+    except RpcError as error:
+        arrivals.put((call, error))
+
+
+class AsyncGrpcTts(_GrpcTtsBase):
+    """Asynchronous (asyncio) TTS Client service.
+
+    A single grpc.aio Channel multiplexes any number of concurrent streams,
+    so one event loop can drive many in-flight syntheses.
+    """
+
+    default_options = ASYNC_OPTIONS
+    metrics: Metrics = METRICS
+    drain_secs: float = 60
+    warm_timeout: float = 10
+    channel: aio.Channel
+    stub_tts: Tts
 
-    @classmethod
     @log_call(include_args=["options"], include_result=False)
-    def default(
-        cls,
+    def __init__(
+        self,
         session: Session = None,
         *params: TtsParams,
-        options: tuple[tuple[str, int]] = None,
-    ) -> "GrpcTts":
-        """Create a TTS gRPC client with defaults and optional overrides.
+        options=ASYNC_OPTIONS,
+        channel_credentials: ChannelCredentials = None,
+        timeout: float = None,
+    ):
+        """Asynchronous TTS GRPC Client.
 
         :param session: Grant Session for Authorization
         :param *params: List of TtsParams objects (later overrides earlier)
         :param options: gRPC ChannelOptions
+        :param channel_credentials: gRPC ChannelCredentials (default: SSL)
+        :param timeout: Default seconds to finish each synthesis (default: no deadline)
         """
-        session = session or Session.default()
-        params = (
-            HyperParameters.default(),
-            JobParameters.default(),
-        ) + (params or ())
-        options = options or SYNC_OPTIONS
-        return cls(session, *params, options=options)
+        self.session = session
+        self._merge_params(*params)
+        self.options = options
+        self.timeout = timeout
+        self.channel_credentials = channel_credentials or ssl_channel_credentials()
+        self.channel_target = self.target
+        self.channel = self._open(self.channel_target)
+        self.stub_tts = raw_tts_stub(self.channel)
+        self._retarget_task: asyncio.Task = None
+
+    def _open(self, target: str) -> aio.Channel:
+        """Open a new Channel to target."""
+        return aio.secure_channel(
+            target,
+            credentials=self.channel_credentials,
+            options=self.options,
+            compression=Compression.Gzip,
+        )
+
+    async def warm(self, timeout: float = None):
+        """Connect the channel now, so the first calls skip TLS and HTTP/2 setup.
+
+        :param timeout: Seconds to wait for the channel (default: warm_timeout)
+        """
+        timeout = self.warm_timeout if timeout is None else timeout
+        await asyncio.wait_for(self.channel.channel_ready(), timeout)
+
+    def _retarget(self, target: str):
+        """Move to a new target in the background, unless already moving."""
+        if self._retarget_task and not self._retarget_task.done():
+            return
+        self._retarget_task = asyncio.get_running_loop().create_task(
+            self._swap_channel(target)
+        )
+
+    async def _swap_channel(self, target: str):
+        """Warm a Channel to target, swap it in and drain the old Channel."""
+        channel = self._open(target)
+        try:
+            await asyncio.wait_for(channel.channel_ready(), self.warm_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                "Channel to %s not ready, keeping %s", target, self.channel_target
+            )
+            await channel.close()
+            return
+        old_channel = self.channel
+        self.channel, self.stub_tts = channel, raw_tts_stub(channel)
+        self.channel_target = target
+        await old_channel.close(self.drain_secs)
 
     @log_call(include_result=False)
-    def __call__(self, texts: list[str]) -> Iterable[TtsResponse]:
-        """Convert list of text strings to an audio byte stream and push
-        audio chunks to a queue.
+    async def __call__(
+        self, texts: list[str], timeout: float = None
+    ) -> AsyncIterator[TtsResponse]:
+        """Convert list of text strings to an audio byte stream.
+
+        Closing the generator (or cancelling its task) cancels the RPC.
 
         :param texts: string to process
+        :param timeout: Seconds to finish the synthesis (default: self.timeout)
         :yield: TtsResponse objects
         """
-        self.tts_params.ClearField("text")
-        self.tts_params.MergeFrom(TtsParams(text=texts))
-        request = TtsRequest(lease=self.lease_ticket, params=self.tts_params)
+        lease = await self.session.alease()
+        if lease.grpc_addr != self.channel_target:
+            self._retarget(lease.grpc_addr)
+        request = self._request(lease, texts)
+        timer = self.metrics.stream_timer()
         # noinspection PyCallingNonCallable
-        yield from self.stub_tts(request)
+        call = self.stub_tts(
+            request, timeout=self.timeout if timeout is None else timeout
+        )
+        try:
+            async for tts_response in call:
+                timer.chunk(tts_response)
+                yield tts_response
+        except Exception:
+            timer.failed()
+            raise
+        finally:
+            call.cancel()
+            timer.finish()
+
+    async def close(self, grace: float = None):
+        """Close the channel, optionally waiting grace seconds for active streams."""
+        await self.channel.close(grace)
+
+    async def __aenter__(self) -> "AsyncGrpcTts":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
@@ -0,0 +1,145 @@
+"""Multi-process synthesis: shard text across worker processes sharing one lease"""
+
+from .logging_config import log_call, logging
+
+logger = logging.getLogger(__name__)
+
+import io
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import IO, Callable, Iterable, Iterator
+
+from grpc import ChannelCredentials
+
+from .auth import Credentials, Lease, LeaseStore, Session
+from .container import WavMuxer
+from .text import LINE_LIMIT, batched, ensure_limits
+from .tts import GrpcTts, TtsParams
+
+__all__ = ["WorkerPool"]
+
+# per worker process, set by _init_worker
+_tts: GrpcTts = None
+_threads: ThreadPoolExecutor = None
+
+
+def _init_worker(
+    credentials: Credentials,
+    url: str,
+    timeout: float,
+    store: LeaseStore,
+    token: bytes,
+    params: bytes,
+    concurrency: int,
+    channel_credentials: Callable[[], ChannelCredentials],
+    kwargs: dict,
+):
+    """Create the worker's GrpcTts: its own channels, the parent's lease."""
+    global _tts, _threads
+    session = Session(credentials, url, timeout, store=store, lease=Lease(token))
+    if channel_credentials is not None:
+        kwargs = {**kwargs, "channel_credentials": channel_credentials()}
+    _tts = GrpcTts(session, TtsParams.FromString(params), **kwargs)
+    _threads = ThreadPoolExecutor(concurrency, thread_name_prefix="pyplayht")
+
+
+def _batch_audio(batch: list[str]) -> list[bytes]:
+    return [tts_response.data for tts_response in _tts(batch)]
+
+
+def _synthesize(lines: list[str]) -> bytes:
+    """Synthesize a shard of text lines into one WAVE stream (in a worker)."""
+    chunks = (chunk for line in lines for chunk in ensure_limits(line))
+    output = io.BytesIO()
+    with WavMuxer(output) as muxer:
+        for audio in _threads.map(_batch_audio, batched(chunks, LINE_LIMIT)):
+            for data in audio:
+                muxer.write(data)
+    return output.getvalue()
+
+
+class WorkerPool:
+    """Process pool synthesizing shards of text lines, merged in input order.
+
+    Text splitting, protobuf and audio handling run in the workers, outside
+    the parent's GIL. Workers are spawned (not forked, which gRPC channels
+    do not survive) and each opens its own channels, but they all start
+    with the parent session's lease instead of each requesting one.
+
+    :param session: Grant Session whose lease (and credentials) the workers use
+    :param *params: List of TtsParams objects (later overrides earlier)
+    :param workers: Worker processes (default: one per CPU)
+    :param concurrency: Requests each worker keeps in flight
+    :param shard_lines: Text lines per shard sent to a worker
+    :param channel_credentials: Function creating the gRPC ChannelCredentials in each worker (default: SSL)
+    :param **kwargs: Other GrpcTts keyword arguments (picklable)
+    """
+
+    def __init__(
+        self,
+        session: Session,
+        *params: TtsParams,
+        workers: int = None,
+        concurrency: int = 1,
+        shard_lines: int = 64,
+        channel_credentials: Callable[[], ChannelCredentials] = None,
+        **kwargs,
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.shard_lines = shard_lines
+        # merged once, so every worker uses the same voice and seed
+        self.tts_params = GrpcTts.default_params(*params)
+        self.executor = ProcessPoolExecutor(
+            self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(
+                session.credentials,
+                session.request.full_url,
+                session.timeout,
+                session.store,
+                session.lease.token,
+                self.tts_params.SerializeToString(),  # protobuf messages do not pickle
+                concurrency,
+                channel_credentials,
+                kwargs,
+            ),
+        )
+
+    @log_call(include_args=[], include_result=False)
+    def map(self, texts: Iterable[str]) -> Iterator[bytes]:
+        """Synthesize text lines, yielding the WAVE stream of each shard in input order.
+
+        Up to two shards per worker are in flight at once.
+
+        :param texts: Text lines (file object or other iterable)
+        :yield: One WAVE stream (header included) per shard
+        """
+        window: deque[Future] = deque()
+        try:
+            for shard in batched(texts, self.shard_lines):
+                if len(window) == 2 * self.workers:
+                    yield window.popleft().result()
+                window.append(self.executor.submit(_synthesize, shard))
+            while window:
+                yield window.popleft().result()
+        finally:
+            for future in window:
+                future.cancel()
+
+    def write(self, texts: Iterable[str], output: IO[bytes]):
+        """Synthesize text lines into output (a WavMuxer joins the shards)."""
+        for audio in self.map(texts):
+            output.write(audio)
+
+    def close(self):
+        """Stop the workers."""
+        self.executor.shutdown(cancel_futures=True)
+
+    def __enter__(self) -> "WorkerPool":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
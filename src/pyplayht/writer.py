@@ -0,0 +1,193 @@
+"""Batched binary output (writev) with a bounded coalescing window"""
+
+from .logging_config import log_call, logging
+
+logger = logging.getLogger(__name__)
+
+import io
+import os
+import threading
+from time import monotonic
+from typing import IO
+
+__all__ = ["CoalescingWriter"]
+
+try:
+    IOV_MAX = os.sysconf("SC_IOV_MAX")
+except (AttributeError, ValueError, OSError):
+    IOV_MAX = 1024
+
+
+class CoalescingWriter:
+    """Binary writer gathering chunks into one writev per batch.
+
+    Written chunks are kept by reference (as memoryviews, never copied into
+    a buffer) and sent with a single writev once max_bytes are pending or
+    max_delay seconds after the oldest pending chunk, whichever comes first.
+    Immediate mode sends every chunk as soon as it is written, for
+    interactive playback.
+
+    >>> output = io.BytesIO()
+    >>> with CoalescingWriter(output, max_delay=60) as writer:
+    ...     _ = writer.write(b'ab'), writer.write(b'cd')
+    ...     output.getvalue()
+    b''
+    >>> output.getvalue(), writer.batches
+    (b'abcd', 1)
+
+    :param output: Binary file to write to (by file descriptor when it has one)
+    :param max_delay: Seconds a chunk may wait for a batch
+    :param max_bytes: Pending bytes that send a batch at once
+    :param immediate: Send every chunk at once
+    """
+
+    def __init__(
+        self,
+        output: IO[bytes],
+        max_delay: float = 0.02,
+        max_bytes: int = 256 * 2**10,
+        immediate: bool = False,
+    ):
+        self.output = output
+        self.max_delay = max_delay
+        self.max_bytes = max_bytes
+        self.immediate = immediate or max_delay <= 0
+        self.batches = 0
+        self.syscalls = 0
+        self.bytes_written = 0
+        try:
+            self._fd = output.fileno()
+            output.flush()
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            self._fd = None
+        self._pending: list[memoryview] = []
+        self._pending_bytes = 0
+        self._deadline = 0.0
+        self._error: OSError = None
+        self._closed = False
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._flusher: threading.Thread = None
+
+    @log_call(include_args=[], include_result=False)
+    def write(self, data: bytes) -> int:
+        """Queue data (which must not change afterwards) for the next batch.
+
+        :raises OSError: if sending an earlier batch failed
+        """
+        view = memoryview(data).cast("B")
+        size = len(view)
+        if not size:
+            return 0
+        if self.immediate:
+            with self._lock:
+                self._raise_error()
+                self.batches += 1
+                self._write_all([view])
+            return size
+        if not view.readonly:
+            view = memoryview(bytes(view))
+        with self._lock:
+            self._raise_error()
+            self._pending.append(view)
+            self._pending_bytes += size
+            if self._pending_bytes >= self.max_bytes or len(self._pending) >= IOV_MAX:
+                self._send()
+            elif len(self._pending) == 1:
+                self._deadline = monotonic() + self.max_delay
+                self._start_flusher()
+                self._wake.notify()
+        return size
+
+    def _start_flusher(self):
+        """Start the thread sending batches that reach max_delay (hold the lock)."""
+        if self._flusher is None:
+            self._flusher = threading.Thread(
+                target=self._run, name="pyplayht-writer", daemon=True
+            )
+            self._flusher.start()
+
+    def _run(self):
+        with self._wake:
+            while not self._closed:
+                if not self._pending:
+                    self._wake.wait()
+                    continue
+                delay = self._deadline - monotonic()
+                if delay > 0:
+                    self._wake.wait(delay)
+                    continue
+                try:
+                    self._send()
+                except OSError as error:
+                    self._error = error
+
+    def _send(self):
+        """Send the pending chunks (hold the lock)."""
+        buffers, self._pending, self._pending_bytes = self._pending, [], 0
+        self.batches += 1
+        self._write_all(buffers)
+
+    def _write_all(self, buffers: list[memoryview]):
+        """Write buffers completely, with as few writev calls as possible."""
+        if self._fd is None or not hasattr(os, "writev"):
+            for buffer in buffers:
+                self.output.write(buffer)
+                self.syscalls += 1
+                self.bytes_written += len(buffer)
+            return
+        while buffers:
+            written = os.writev(self._fd, buffers[:IOV_MAX])
+            self.syscalls += 1
+            self.bytes_written += written
+            index = 0
+            while index < len(buffers) and written >= len(buffers[index]):
+                written -= len(buffers[index])
+                index += 1
+            buffers = buffers[index:]
+            if written:
+                buffers[0] = buffers[0][written:]
+
+    def _raise_error(self):
+        """Raise (once) the error of a failed background send (hold the lock)."""
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def flush(self):
+        """Send the pending chunks now."""
+        with self._lock:
+            self._raise_error()
+            if self._pending:
+                self._send()
+
+    def seekable(self) -> bool:
+        return self.output.seekable()
+
+    def tell(self) -> int:
+        self.flush()
+        return self.output.tell()
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        self.flush()
+        return self.output.seek(offset, whence)
+
+    def fileno(self) -> int:
+        return self.output.fileno()
+
+    def close(self):
+        """Send the pending chunks and stop the background thread (output stays open)."""
+        try:
+            self.flush()
+        finally:
+            with self._lock:
+                self._closed = True
+                self._wake.notify()
+            if self._flusher is not None:
+                self._flusher.join()
+
+    def __enter__(self) -> "CoalescingWriter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
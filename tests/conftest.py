@@ -0,0 +1,46 @@
+"""Shared fixtures: a local fake PlayHT stack and GrpcTts clients of it"""
+
+import pytest
+
+from pyplayht import GrpcTts, TtsParams
+from pyplayht.fake import FakePlayHT, FakeTtsServicer
+from pyplayht.retry import RetryPolicy
+
+SEEDED = TtsParams(voice="test-voice", seed=7)
+UNSEEDED = TtsParams(voice="test-voice")
+FAST_RETRY = RetryPolicy(initial_backoff=0.01, max_backoff=0.05)
+TEXTS = ["Hello world."]
+
+
+@pytest.fixture
+def servicer() -> FakeTtsServicer:
+    """Tts servicer of the fake stack (override in a module for other behavior)."""
+    return FakeTtsServicer(latency=0, chunk_size=1024)
+
+
+@pytest.fixture
+def fake(servicer):
+    with FakePlayHT(servicer) as fake:
+        yield fake
+
+
+@pytest.fixture
+def make_tts(fake):
+    """Return a factory of GrpcTts clients of the fake stack (seeded by default)."""
+    clients = []
+
+    def make_tts(*params: TtsParams, **kwargs) -> GrpcTts:
+        kwargs.setdefault("retry", FAST_RETRY)
+        tts = GrpcTts(
+            fake.session(),
+            *(params or (SEEDED,)),
+            channel_credentials=fake.channel_credentials,
+            **kwargs,
+        )
+        clients.append(tts)
+        return tts
+
+    yield make_tts
+    for tts in clients:
+        tts.close()
+        tts.session.close()
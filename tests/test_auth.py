@@ -0,0 +1,57 @@
+"""Lease refresh: on rejection, ahead of expiry, shared between callers and processes"""
+
+import threading
+
+import pytest
+from conftest import TEXTS
+
+from pyplayht.auth import STORE_REFRESH_AHEAD, Credentials, LeaseStore, Session
+from pyplayht.fake import FakePlayHT
+
+
+def test_rejected_lease_is_refreshed_and_retried(fake, make_tts):
+    tts = make_tts()
+    assert list(tts(TEXTS))
+    assert fake.auth.requests == 1
+    fake.auth.leases.clear()  # the server stops accepting the current lease
+    assert list(tts(TEXTS))
+    assert fake.auth.requests == 2
+    assert fake.servicer.requests == 3
+    assert tts.session.lease.token in fake.auth.leases
+
+
+def test_concurrent_callers_share_one_refresh():
+    with FakePlayHT(lease_latency=0.2) as fake:
+        session = fake.session()
+        leases = []
+        threads = [
+            threading.Thread(target=lambda: leases.append(session.lease))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert fake.auth.requests == 1
+        assert len({lease.token for lease in leases}) == 1
+
+
+def test_invalidate_refreshes_only_once(fake):
+    session = fake.session()
+    stale = session.lease
+    fresh = session.invalidate(stale)
+    assert fresh.token != stale.token
+    assert session.invalidate(stale) is fresh
+    assert fake.auth.requests == 2
+
+
+@pytest.mark.parametrize("duration, requests", [(3600, 1), (60, 3)])
+def test_stored_lease_is_shared_until_due(tmp_path, duration, requests):
+    store = LeaseStore(tmp_path)
+    with FakePlayHT(lease_duration=duration) as fake:
+        for _ in range(3):
+            session = Session(Credentials("id", "key"), fake.auth.url, store=store)
+            assert session.refresh_ahead.total_seconds() == STORE_REFRESH_AHEAD
+            session.lease
+            session.close()
+        assert fake.auth.requests == requests
@@ -0,0 +1,67 @@
+"""AudioCache: hits and misses through GrpcTts, the on-disk tier and corrupt files"""
+
+import pytest
+from conftest import SEEDED, TEXTS, UNSEEDED
+
+from pyplayht.cache import AudioCache
+
+
+def audio(stream) -> bytes:
+    return b"".join(tts_response.data for tts_response in stream)
+
+
+def test_seeded_calls_hit_the_cache(fake, make_tts):
+    cache = AudioCache()
+    tts = make_tts(cache=cache)
+    first = audio(tts(TEXTS))
+    assert audio(tts(TEXTS)) == first
+    assert fake.servicer.requests == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+    audio(tts(["Other text."]))
+    assert fake.servicer.requests == 2
+    assert cache.misses == 2
+
+
+def test_unseeded_calls_are_not_cached(fake, make_tts):
+    cache = AudioCache()
+    tts = make_tts(UNSEEDED, cache=cache)
+    audio(tts(TEXTS))
+    audio(tts(TEXTS))
+    assert fake.servicer.requests == 2
+    assert cache.size == 0
+
+
+def test_disk_tier_is_shared_between_caches(fake, make_tts, tmp_path):
+    first = audio(make_tts(cache=AudioCache(directory=tmp_path))(TEXTS))
+    cache = AudioCache(directory=tmp_path)
+    assert audio(make_tts(cache=cache)(TEXTS)) == first
+    assert fake.servicer.requests == 1
+    assert cache.hits == 1
+
+
+@pytest.mark.parametrize(
+    "corrupt",
+    [
+        lambda data: data[:2],  # truncated length prefix
+        lambda data: data[:-1],  # truncated chunk
+        lambda data: b"\xff\xff\xff\xff" + data,  # impossible length
+    ],
+)
+def test_corrupt_disk_file_is_a_miss(tmp_path, corrupt):
+    key = AudioCache.key(SEEDED, TEXTS)
+    AudioCache(directory=tmp_path).put(key, [b"chunk", b"chunk"])
+    path = tmp_path / key[:2] / key
+    path.write_bytes(corrupt(path.read_bytes()))
+    cache = AudioCache(directory=tmp_path)
+    assert cache.get(key) is None
+    assert cache.misses == 1
+    assert not path.exists()
+
+
+def test_disk_tier_is_bounded(tmp_path):
+    cache = AudioCache(max_bytes=0, directory=tmp_path, max_disk_bytes=100)
+    for number in range(10):
+        cache.put(f"{number:02d}key", [bytes(30)])
+    files = [path for path in tmp_path.rglob("*") if path.is_file()]
+    assert sum(path.stat().st_size for path in files) <= 100
+    assert cache.get("09key") == [bytes(30)]
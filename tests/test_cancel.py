@@ -0,0 +1,71 @@
+"""Cancelled, closed and timed-out Tts streams"""
+
+import gc
+from time import perf_counter
+
+import grpc
+import pytest
+from conftest import TEXTS
+
+from pyplayht.fake import FakeTtsServicer
+from pyplayht.retry import RetryPolicy
+
+
+@pytest.fixture
+def servicer() -> FakeTtsServicer:
+    return FakeTtsServicer(latency=0, chunk_size=1024, chunk_interval=0.01)
+
+
+def outstanding(tts) -> int:
+    return sum(entry.outstanding for entry in tts.pool.entries)
+
+
+def test_cancel_before_iterating(fake, make_tts):
+    stream = make_tts()(TEXTS)
+    stream.cancel()
+    assert list(stream) == []
+    assert stream.cancelled
+    assert fake.servicer.requests == 0
+
+
+def test_cancel_mid_stream_ends_iteration(make_tts):
+    tts = make_tts()
+    stream = tts(TEXTS)
+    first = next(stream)
+    stream.cancel()
+    assert first.sequence == 0
+    assert list(stream) == []
+    assert outstanding(tts) == 0
+
+
+def test_dropped_stream_releases_its_channel(make_tts):
+    tts = make_tts()
+    gc.disable()
+    try:
+        stream = tts(TEXTS)
+        next(stream)
+        assert outstanding(tts) == 1
+        del stream
+        assert outstanding(tts) == 0
+    finally:
+        gc.enable()
+
+
+def test_deadline_covers_a_stalled_stream(fake, make_tts):
+    fake.servicer.stall_rate, fake.servicer.stall_secs = 1, 2
+    start = perf_counter()
+    with pytest.raises(grpc.RpcError) as raised:
+        list(make_tts()(TEXTS, timeout=0.2))
+    assert raised.value.code() == grpc.StatusCode.DEADLINE_EXCEEDED
+    assert perf_counter() - start < 1
+
+
+def test_deadline_stops_retries(fake, make_tts):
+    fake.servicer.error_rate = 1
+    tts = make_tts(retry=RetryPolicy(initial_backoff=1, jitter=0))
+    start = perf_counter()
+    with pytest.raises(grpc.RpcError) as raised:
+        list(tts(TEXTS, timeout=0.5))
+    assert raised.value.code() == grpc.StatusCode.UNAVAILABLE
+    assert fake.servicer.requests == 1  # the backoff would pass the deadline
+    assert perf_counter() - start < 0.5
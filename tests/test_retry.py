@@ -0,0 +1,73 @@
+"""Retried Tts streams: no repeated or missing chunks, no spliced seeds"""
+
+from dataclasses import dataclass, field
+
+import grpc
+import pytest
+from conftest import TEXTS, UNSEEDED
+
+from pyplayht.fake import FakeTtsServicer
+
+
+@dataclass
+class InterruptingServicer(FakeTtsServicer):
+    """Fails the first request with code after `after` chunks."""
+
+    code: grpc.StatusCode = field(default=grpc.StatusCode.UNAVAILABLE)
+    after: int = field(default=3)
+
+    def Tts(self, request, context):
+        first = not self.requests
+        for count, tts_response in enumerate(super().Tts(request, context)):
+            if first and count == self.after:
+                context.abort(self.code, "Interrupted")
+            yield tts_response
+
+
+@pytest.fixture
+def servicer() -> InterruptingServicer:
+    return InterruptingServicer(latency=0, chunk_size=1024)
+
+
+@pytest.mark.parametrize(
+    "code", [grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.UNAUTHENTICATED]
+)
+def test_seeded_retry_resumes_without_duplicates(fake, make_tts, code):
+    fake.servicer.code = code
+    responses = list(make_tts()(TEXTS))
+    sequences = [tts_response.sequence for tts_response in responses]
+    assert fake.servicer.requests == 2
+    assert sequences == list(range(len(sequences)))
+    expected = b"".join(tts_response.data for tts_response in make_tts()(TEXTS))
+    assert b"".join(tts_response.data for tts_response in responses) == expected
+
+
+@pytest.mark.parametrize(
+    "code", [grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.UNAUTHENTICATED]
+)
+def test_unseeded_stream_is_not_retried_after_chunks(fake, make_tts, code):
+    fake.servicer.code = code
+    sequences = []
+    with pytest.raises(grpc.RpcError) as raised:
+        for tts_response in make_tts(UNSEEDED)(TEXTS):
+            sequences.append(tts_response.sequence)
+    assert raised.value.code() == code
+    assert sequences == [0, 1, 2]
+    assert fake.servicer.requests == 1
+
+
+def test_unseeded_stream_is_retried_before_chunks(fake, make_tts):
+    fake.servicer.after = 0
+    responses = list(make_tts(UNSEEDED)(TEXTS))
+    assert fake.servicer.requests == 2
+    assert [tts_response.sequence for tts_response in responses] == list(
+        range(len(responses))
+    )
+
+
+def test_retries_stop_at_max_attempts(fake, make_tts):
+    fake.servicer.error_rate = 1
+    with pytest.raises(grpc.RpcError) as raised:
+        list(make_tts()(TEXTS))
+    assert raised.value.code() == grpc.StatusCode.UNAVAILABLE
+    assert fake.servicer.requests == 3